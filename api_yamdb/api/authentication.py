@@ -0,0 +1,96 @@
+"""
+Аутентификация по JWT без обращения к таблице пользователей.
+
+Роль и признак суперпользователя записываются в токен при выдаче
+ (add_user_claims), а пользователь запроса собирается из claims. Чтобы
+ смена роли, блокировка или удаление пользователя вступали в силу до
+ истечения токена, актуальное состояние пользователя хранится в кэше в
+ памяти и сверяется с claims на каждом запросе.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+CLAIMS = ('username', 'role', 'is_superuser')
+STATE_KEY = 'auth:state:{user_id}'
+MISSING = 'missing'
+
+
+def add_user_claims(token, user):
+    """Записывает в токен данные, нужные для проверки прав."""
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_cache():
+    return caches[settings.STATELESS_JWT['CACHE_ALIAS']]
+
+
+def get_user_state(user_id):
+    """
+    Актуальные (is_active, role, is_superuser) пользователя или None, если
+     пользователь удалён. При промахе кэша - один лёгкий запрос к БД.
+    """
+    cache = get_cache()
+    key = STATE_KEY.format(user_id=user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list(
+            'is_active', 'role', 'is_superuser'
+        ).first() or MISSING
+        cache.set(key, state, settings.STATELESS_JWT['STATE_TIMEOUT'])
+    return None if state == MISSING else tuple(state)
+
+
+def forget_user_state(user_id):
+    get_cache().delete(STATE_KEY.format(user_id=user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, которая не загружает пользователя из БД.
+
+    Пользователь запроса - несохраняемый экземпляр модели с id, username,
+     role и is_superuser из токена (is_token_user = True): его можно
+     сравнивать с авторами и присваивать внешним ключам, но остальные поля
+     профиля в нём пусты. Токены без claims и токены, выданные до смены
+     роли, обрабатываются как в JWTAuthentication - с загрузкой из БД.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        state = get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        is_active, role, is_superuser = state
+        if not is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if (role, is_superuser) != (
+            validated_token['role'], validated_token['is_superuser']
+        ):
+            return super().get_user(validated_token)
+
+        user = User(
+            pk=user_id,
+            username=validated_token['username'],
+            role=role,
+            is_superuser=is_superuser,
+            is_active=is_active,
+        )
+        user._state.adding = False
+        user.is_token_user = True
+        return user
@@ -0,0 +1,252 @@
+"""
+Пакетная загрузка отзывов и комментариев администратором.
+
+Пакет передаётся JSON-массивом или потоком NDJSON (объект на строку).
+ Каждый элемент проверяется сериализатором, а ссылки на произведения,
+ отзывы и авторов и уникальность отзывов - несколькими запросами на весь
+ пакет. Прошедшие проверку элементы записываются одним bulk_create в той же
+ транзакции, что и проверки, после чего оценки пакета добавляются к
+ рейтингам затронутых произведений одним UPDATE на произведение. В ответе
+ указан результат по каждому элементу, в порядке пакета.
+"""
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.permissions import IsAdmin
+from api.serializers import BulkCommentSerializer, BulkReviewSerializer
+from api.signals import schedule_invalidation
+from reviews.models import Comment, Review, Title
+
+User = get_user_model()
+
+CREATED = 'created'
+ERROR = 'error'
+
+# Сколько раз пакет перепроверяется и записывается заново, если запись
+# нарушила ограничение базы из-за параллельно созданных строк.
+CONFLICT_RETRIES = 3
+
+
+class NDJSONParser(BaseParser):
+    """Поток JSON-объектов, по одному на строку; пустые строки пропускаются."""
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream or (), 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as error:
+                raise ParseError(f'Строка {number}: {error}')
+        return items
+
+
+class BulkCreateView(APIView):
+    """
+    Основа пакетной загрузки: item_serializer_class проверяет поля
+     элемента, build_objects - ссылки сразу для всех элементов, after_create
+     обновляет зависящие от записей данные.
+    """
+
+    permission_classes = (IsAdmin,)
+    parser_classes = (JSONParser, NDJSONParser)
+    item_serializer_class = None
+    model = None
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Ожидается массив объектов.')
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            raise ValidationError(
+                f'В пакете больше {settings.BULK_CREATE_MAX_ITEMS} элементов.'
+            )
+        self.results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = self.item_serializer_class(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                self.reject(index, serializer.errors)
+
+        with transaction.atomic():
+            self.resolve_authors(valid)
+            objects = self.create_objects(valid)
+        for index in objects:
+            self.results[index] = {'status': CREATED}
+
+        return Response({
+            'created': len(objects),
+            'errors': len(items) - len(objects),
+            'results': [
+                {'index': index, **result}
+                for index, result in enumerate(self.results)
+            ],
+        }, status=status.HTTP_200_OK)
+
+    def reject(self, index, errors):
+        self.results[index] = {'status': ERROR, 'errors': errors}
+
+    def resolve_authors(self, valid):
+        """
+        Идентификаторы авторов по именам одним запросом; элементы с
+         неизвестным автором отклоняются.
+        """
+        usernames = {
+            data['author'] for data in valid.values() if 'author' in data
+        }
+        authors = dict(
+            User.objects.filter(username__in=usernames, pending_deletion=False)
+            .values_list('username', 'pk')
+        )
+        for index, data in list(valid.items()):
+            username = data.get('author')
+            if username is None:
+                data['author_id'] = self.request.user.pk
+            elif username in authors:
+                data['author_id'] = authors[username]
+            else:
+                del valid[index]
+                self.reject(index, {
+                    'author': [f'Пользователь "{username}" не найден.']
+                })
+
+    def create_objects(self, valid):
+        """
+        Проверяет ссылки и записывает пакет в точке сохранения. Если запись
+         нарушила ограничение (строку создали после проверки), точка
+         сохранения откатывается, и пакет проверяется заново: конфликтующие
+         элементы отклоняет build_objects. Возвращает записанные объекты.
+        """
+        for _ in range(CONFLICT_RETRIES):
+            objects = self.build_objects(valid)
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(objects.values())
+            except IntegrityError:
+                continue
+            self.after_create(objects.values())
+            return objects
+        for index in objects:
+            self.reject(index, {'non_field_errors': [
+                'Запись конфликтует с параллельными изменениями, '
+                'повторите запрос.'
+            ]})
+        return {}
+
+    def build_objects(self, valid):
+        """
+        Возвращает {индекс элемента: несохранённый объект}; элементы с
+         неверными ссылками отклоняются.
+        """
+        raise NotImplementedError
+
+    def after_create(self, objects):
+        pass
+
+
+class BulkReviewView(BulkCreateView):
+    """Пакетная загрузка отзывов: POST /api/v1/bulk/reviews/."""
+
+    item_serializer_class = BulkReviewSerializer
+    model = Review
+
+    def build_objects(self, valid):
+        title_ids = {data['title'] for data in valid.values()}
+        # Блокировка не даёт удалить или пометить произведения до записи.
+        titles = set(
+            Title.objects.select_for_update()
+            .filter(pk__in=title_ids, pending_deletion=False)
+            .values_list('pk', flat=True)
+        )
+        # Пары (автор, произведение), для которых отзыв уже есть. Запрос
+        # выбирает пересечение множеств, а не сами пары, поэтому может
+        # вернуть лишнее, но остаётся одним на весь пакет.
+        taken = set(
+            Review.objects.filter(
+                title_id__in=titles,
+                author_id__in={data['author_id'] for data in valid.values()},
+            ).values_list('author_id', 'title_id')
+        )
+        objects = {}
+        for index, data in valid.items():
+            pair = (data['author_id'], data['title'])
+            if data['title'] not in titles:
+                self.reject(index, {
+                    'title': [f'Произведение {data["title"]} не найдено.']
+                })
+            elif pair in taken:
+                self.reject(index, {'non_field_errors': [
+                    'Можно оставить только один отзыв для произведения!'
+                ]})
+            else:
+                taken.add(pair)
+                objects[index] = Review(
+                    title_id=data['title'],
+                    author_id=data['author_id'],
+                    text=data['text'],
+                    score=data['score'],
+                )
+        return objects
+
+    def after_create(self, objects):
+        # bulk_create не вызывает сигналы: рейтинги и кэш обновляются здесь.
+        scores = defaultdict(list)
+        for review in objects:
+            scores[review.title_id].append(review.score)
+        if not scores:
+            return
+        for title_id, title_scores in scores.items():
+            Title.objects.filter(pk=title_id).add_scores(title_scores)
+        schedule_invalidation(
+            ['titles', *(f'reviews:{pk}' for pk in scores)]
+        )
+
+
+class BulkCommentView(BulkCreateView):
+    """Пакетная загрузка комментариев: POST /api/v1/bulk/comments/."""
+
+    item_serializer_class = BulkCommentSerializer
+    model = Comment
+
+    def build_objects(self, valid):
+        reviews = set(
+            Review.objects.select_for_update().filter(
+                pk__in={data['review'] for data in valid.values()},
+                title__pending_deletion=False,
+            ).values_list('pk', flat=True)
+        )
+        objects = {}
+        for index, data in valid.items():
+            if data['review'] not in reviews:
+                self.reject(index, {
+                    'review': [f'Отзыв {data["review"]} не найден.']
+                })
+            else:
+                objects[index] = Comment(
+                    review_id=data['review'],
+                    author_id=data['author_id'],
+                    text=data['text'],
+                )
+        return objects
+
+    def after_create(self, objects):
+        review_ids = {comment.review_id for comment in objects}
+        if review_ids:
+            schedule_invalidation([f'comments:{pk}' for pk in review_ids])
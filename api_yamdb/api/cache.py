@@ -0,0 +1,169 @@
+"""
+Кэширование ответов read-only эндпоинтов каталога.
+
+Ответы хранятся под ключом, в который входят путь, параметры запроса и
+ текущая версия пространства имён (genres, categories, titles). Запись в
+ модели каталога увеличивает версию затронутых пространств (см.
+ api.signals), и старые ответы просто перестают запрашиваться, а затем
+ вытесняются по таймауту.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+VERSION_KEY = 'api:version:{namespace}'
+RESPONSE_KEY = 'api:response:{namespace}:{version}:{digest}'
+STATS_KEY = 'api:stats:{namespace}:{event}'
+HIT = 'hit'
+MISS = 'miss'
+
+
+def get_cache():
+    return caches[settings.API_RESPONSE_CACHE['ALIAS']]
+
+
+def increment(key, delta=1, timeout=None):
+    cache = get_cache()
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Хранилище ничего не сохраняет (DummyCache) - считать нечего.
+        return None
+
+
+def get_version(namespace):
+    """
+    Текущая версия пространства имён - время последнего изменения в
+     наносекундах.
+
+    Начальное значение берётся от текущего времени, чтобы после вытеснения
+     или истечения ключа версия не совпала с одной из уже использованных.
+     Для хранилища без состояния (DummyCache) версия равна None.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(
+            key, time.time_ns(),
+            timeout=settings.API_RESPONSE_CACHE['VERSION_TIMEOUT'],
+        )
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*namespaces):
+    """
+    Делает недействительными все закэшированные ответы пространств.
+
+    Версия сдвигается атомарным incr до текущего времени (минимум на
+     единицу), поэтому она растёт монотонно и служит временем изменения.
+    """
+    for namespace in namespaces:
+        version = get_version(namespace)
+        if version is None:
+            continue
+        increment(
+            VERSION_KEY.format(namespace=namespace),
+            max(1, time.time_ns() - version),
+            settings.API_RESPONSE_CACHE['VERSION_TIMEOUT'],
+        )
+
+
+def cache_stats(namespaces):
+    cache = get_cache()
+    return {
+        namespace: {
+            event: cache.get(
+                STATS_KEY.format(namespace=namespace, event=event), 0
+            )
+            for event in (HIT, MISS)
+        }
+        for namespace in namespaces
+    }
+
+
+def reset_stats(namespaces):
+    get_cache().delete_many([
+        STATS_KEY.format(namespace=namespace, event=event)
+        for namespace in namespaces
+        for event in (HIT, MISS)
+    ])
+
+
+class CachedResponseMixin:
+    """
+    Кэширует JSON-ответы обработчиков, обёрнутых в cached.
+
+    Права доступа проверяются до обращения к кэшу, а сами ответы этих
+     эндпоинтов не зависят от пользователя, поэтому один ответ
+     отдаётся всем клиентам. Заголовок X-Cache сообщает, был ли ответ
+     взят из кэша.
+    """
+
+    cache_namespace = None
+
+    def get_response_cache_key(self, request):
+        query = sorted(request.query_params.lists())
+        digest = hashlib.sha1(
+            f'{request.path}?{query}'.encode('utf-8')
+        ).hexdigest()
+        return RESPONSE_KEY.format(
+            namespace=self.cache_namespace,
+            version=get_version(self.cache_namespace),
+            digest=digest,
+        )
+
+    def cached(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            increment(STATS_KEY.format(
+                namespace=self.cache_namespace, event=HIT
+            ))
+            status, content, content_type = cached
+            response = HttpResponse(
+                content, status=status, content_type=content_type
+            )
+            response['X-Cache'] = 'HIT'
+            return response
+
+        increment(STATS_KEY.format(namespace=self.cache_namespace, event=MISS))
+        response = handler(request, *args, **kwargs)
+        response['X-Cache'] = 'MISS'
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key,
+                    (
+                        rendered.status_code,
+                        rendered.content,
+                        rendered['Content-Type'],
+                    ),
+                    settings.API_RESPONSE_CACHE['TIMEOUT'],
+                )
+            )
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
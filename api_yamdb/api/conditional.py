@@ -0,0 +1,70 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для каталога, отзывов и
+ комментариев.
+
+Валидаторы строятся по версиям пространств имён из api.cache и не
+ требуют обращений к БД: если клиент прислал актуальный ETag или дату, ответ
+ 304 Not Modified возвращается без выборки и сериализации. Поэтому они
+ выдаются, только когда хранилище версий общее для всех процессов
+ (API_RESPONSE_CACHE['CONDITIONAL_GET']).
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from api.cache import get_version
+
+NANOSECONDS = 10 ** 9
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag и Last-Modified к ответам list и retrieve и отвечает 304
+     на условные запросы с актуальными валидаторами.
+
+    validator_namespaces - имена пространств, версии которых вместе
+     меняются при любом изменении данных эндпоинта; подставляются kwargs
+     маршрута.
+    """
+
+    validator_namespaces = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def get_validators(self, request):
+        if not settings.API_RESPONSE_CACHE['CONDITIONAL_GET']:
+            return None, None
+        versions = {
+            namespace: get_version(namespace)
+            for namespace in (
+                template.format(**self.kwargs)
+                for template in self.validator_namespaces
+            )
+        }
+        if None in versions.values():
+            return None, None
+        digest = hashlib.sha1(
+            f'{sorted(versions.items())}:{request.get_full_path()}:'
+            f'{request.accepted_renderer.format}'.encode('utf-8')
+        ).hexdigest()
+        return f'"{digest}"', max(versions.values()) // NANOSECONDS
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,246 @@
+"""
+Быстрая сериализация для чтения.
+
+FastSerializer один раз разбирает поля обычного сериализатора DRF и строит
+ из них функции над словарями queryset.values(): какие колонки выбрать и
+ как превратить строку в тот же словарь, что вернул бы сериализатор DRF.
+ Вложенные сериализаторы превращаются в колонки через JOIN (или в колонки
+ той же строки при source='*'), а вложенные списки (many=True) загружаются
+ одним дополнительным запросом на страницу.
+ Результат совпадает с выводом DRF, поэтому и JSON ответа тот же.
+
+FastListMixin и FastRetrieveMixin подключают такой сериализатор к list и
+ retrieve вьюсета; настройка FAST_READ_SERIALIZERS отключает его для всех
+ вьюсетов сразу.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import Http404
+from rest_framework import fields, serializers
+from rest_framework.relations import StringRelatedField
+from rest_framework.response import Response
+
+# Поля, чей to_representation - это приведение типа.
+CONVERTERS = {
+    fields.IntegerField: int,
+    fields.CharField: str,
+    fields.FloatField: float,
+    fields.BooleanField: bool,
+}
+
+
+def get_converter(field):
+    return CONVERTERS.get(type(field), field.to_representation)
+
+
+class CompiledSerializer:
+    """
+    Скомпилированный сериализатор DRF.
+
+    columns - колонки values(), нужные для строки;
+     many - вложенные списки: (имя поля, поле связи, сериализатор элемента);
+     to_representation(row, nested) - словарь ответа по строке, где nested -
+     {имя поля: {pk строки: [элементы]}}.
+    """
+
+    def __init__(self, serializer, model, prefix='', string_sources=None):
+        self.model = model
+        self.columns = []
+        self.many = []
+        self.getters = []
+        string_sources = string_sources or {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = prefix + field.source.replace('.', '__')
+            if isinstance(field, serializers.ListSerializer):
+                self.add_many(name, field, source, prefix)
+            elif isinstance(field, serializers.BaseSerializer) and (
+                field.source == '*'
+            ):
+                self.add_same_row(name, field, model, prefix)
+            elif isinstance(field, serializers.BaseSerializer):
+                self.add_nested(name, field, source, model)
+            elif isinstance(field, StringRelatedField):
+                if name not in string_sources:
+                    raise ImproperlyConfigured(
+                        f'Для поля {name} укажите колонку в string_sources.'
+                    )
+                self.add_column(name, prefix + string_sources[name], str)
+            elif isinstance(field, fields.SerializerMethodField) or (
+                field.source == '*'
+            ):
+                raise ImproperlyConfigured(
+                    f'Поле {name} не может быть скомпилировано.'
+                )
+            else:
+                self.add_column(name, source, get_converter(field))
+
+    def add_column(self, name, column, convert):
+        self.columns.append(column)
+
+        def getter(row, nested):
+            value = row[column]
+            return None if value is None else convert(value)
+
+        self.getters.append((name, getter))
+
+    def add_nested(self, name, field, source, model):
+        related = model._meta.get_field(source.rsplit('__', 1)[-1])
+        child = CompiledSerializer(field, related.related_model, f'{source}__')
+        self.columns.append(source)
+        self.columns.extend(child.columns)
+
+        def getter(row, nested):
+            if row[source] is None:
+                return None
+            return child.to_representation(row, nested)
+
+        self.getters.append((name, getter))
+
+    def add_same_row(self, name, field, model, prefix):
+        child = CompiledSerializer(field, model, prefix)
+        if child.many:
+            raise ImproperlyConfigured(
+                f'Вложенный список в {name} не поддерживается.'
+            )
+        self.columns.extend(child.columns)
+        self.getters.append((name, child.to_representation))
+
+    def add_many(self, name, field, source, prefix):
+        if prefix:
+            raise ImproperlyConfigured(
+                f'Вложенный список {name} поддерживается только на верхнем '
+                f'уровне.'
+            )
+        relation = self.model._meta.get_field(source)
+        child = CompiledSerializer(field.child, relation.related_model)
+        self.many.append((name, relation, child))
+        self.getters.append(
+            (name, lambda row, nested: nested[name].get(row['pk'], []))
+        )
+
+    def to_representation(self, row, nested):
+        return {name: getter(row, nested) for name, getter in self.getters}
+
+    def load_many(self, rows):
+        """
+        Элементы вложенных списков для страницы строк - по одному запросу
+         на список, в порядке сортировки связанной модели, как при
+         prefetch_related.
+        """
+        keys = [row['pk'] for row in rows]
+        nested = {}
+        for name, relation, child in self.many:
+            owner = relation.related_query_name()
+            items = defaultdict(list)
+            for row in relation.related_model.objects.filter(
+                **{f'{owner}__in': keys}
+            ).values(owner, *child.columns):
+                items[row[owner]].append(child.to_representation(row, {}))
+            nested[name] = items
+        return nested
+
+
+class FastSerializer:
+    """
+    serializer_class - сериализатор DRF, вывод которого воспроизводится.
+    string_sources - колонки для StringRelatedField: {поле: колонка},
+     значение колонки приводится к строке.
+    """
+
+    serializer_class = None
+    string_sources = {}
+
+    @classmethod
+    def compiled(cls):
+        if '_compiled' not in cls.__dict__:
+            serializer = cls.serializer_class()
+            cls._compiled = CompiledSerializer(
+                serializer, serializer.Meta.model,
+                string_sources=cls.string_sources,
+            )
+        return cls._compiled
+
+    @classmethod
+    def prepare(cls, queryset):
+        """queryset вьюсета, выбирающий только нужные колонки."""
+        compiled = cls.compiled()
+        return queryset.select_related(None).prefetch_related(None).values(
+            'pk', *compiled.columns
+        )
+
+    @classmethod
+    def serialize(cls, rows):
+        compiled = cls.compiled()
+        rows = list(rows)
+        nested = compiled.load_many(rows) if compiled.many else {}
+        return [compiled.to_representation(row, nested) for row in rows]
+
+
+class FastReadMixin:
+    """
+    Общая часть FastListMixin и FastRetrieveMixin: fast_serializer_class -
+     подкласс FastSerializer, используемый вместо serializer_class;
+     get_fast_serializer_class позволяет выбирать его по действию.
+    """
+
+    fast_serializer_class = None
+
+    def get_fast_serializer_class(self):
+        return self.fast_serializer_class
+
+    def use_fast_serializer(self):
+        return (
+            self.get_fast_serializer_class() is not None
+            and settings.FAST_READ_SERIALIZERS
+        )
+
+    def get_fast_queryset(self):
+        return self.get_fast_serializer_class().prepare(
+            self.filter_queryset(self.get_queryset())
+        )
+
+
+class FastListMixin(FastReadMixin):
+    """Отдаёт list через быстрый сериализатор."""
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().list(request, *args, **kwargs)
+        fast_serializer_class = self.get_fast_serializer_class()
+        queryset = self.get_fast_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                fast_serializer_class.serialize(page)
+            )
+        return Response(fast_serializer_class.serialize(queryset))
+
+
+class FastRetrieveMixin(FastReadMixin):
+    """
+    Отдаёт retrieve через быстрый сериализатор.
+
+    Проверки прав на объект не выполняются: быстрый путь предназначен для
+     вьюсетов, где безопасные методы разрешены всем, кому разрешён сам
+     эндпоинт.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            rows = self.get_fast_serializer_class().serialize(
+                self.get_fast_queryset().filter(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )[:1]
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if not rows:
+            raise Http404
+        return Response(rows[0])
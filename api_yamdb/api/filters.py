@@ -1,6 +1,12 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
 from reviews.models import Title
+from reviews.search import get_search_backend
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
 
 
 class TitleCustomFilter(filters.FilterSet):
@@ -13,15 +19,18 @@ class TitleCustomFilter(filters.FilterSet):
     genre -- фильтрация произведений по их жанрам - поле 'genre'.
     name -- фильтрация произведений по названиям - поле 'name'.
     year -- фильтрация произведений по году выпуска - поле 'year'.
+    search -- полнотекстовый поиск по названию и описанию с сортировкой
+     по релевантности.
+    ids -- произведения с перечисленными через запятую id.
     """
 
     category = filters.CharFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
+        lookup_expr='exact'
     )
     genre = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='exact'
     )
     name = filters.CharFilter(
         field_name='name',
@@ -31,7 +40,29 @@ class TitleCustomFilter(filters.FilterSet):
         field_name='year',
         lookup_expr='exact'
     )
+    search = filters.CharFilter(method='filter_search')
+    ids = NumberInFilter(field_name='id', lookup_expr='in')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'search', 'ids')
+
+    def filter_search(self, queryset, name, value):
+        return get_search_backend().search(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений по хранимым колонкам: ?ordering=-weighted_rating.
+
+    К сортировке добавляется id в направлении последнего поля: порядок
+     страниц однозначен, а сортировка по одному полю читается по
+     составному индексу (поле, id) без сортировки всей таблицы.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering:
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering = (*ordering, f'{direction}id')
+        return ordering
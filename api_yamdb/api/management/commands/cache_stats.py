@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import cache_stats, reset_stats
+from api.signals import NAMESPACES
+
+
+class Command(BaseCommand):
+    help = 'Счётчики попаданий и промахов кэша ответов каталога'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        for namespace, stats in cache_stats(NAMESPACES).items():
+            total = stats['hit'] + stats['miss']
+            ratio = stats['hit'] / total * 100 if total else 0
+            self.stdout.write(
+                f'{namespace}: попаданий {stats["hit"]}, '
+                f'промахов {stats["miss"]} ({ratio:.1f}% из кэша)'
+            )
+        if options['reset']:
+            reset_stats(NAMESPACES)
+            self.stdout.write(self.style.SUCCESS('Счётчики обнулены.'))
@@ -0,0 +1,62 @@
+"""
+Вложенные эндпоинты: отзывы произведения и комментарии к отзыву.
+
+Дочерние записи фильтруются прямо по ключам из URL, без предварительной
+ выборки родителя. Родитель запрашивается, только когда он действительно
+ нужен: при создании записи и чтобы отличить пустой список от
+ несуществующего родителя (404).
+"""
+from django.shortcuts import get_object_or_404
+
+
+class ParentLookupMixin:
+    """
+    parent_model - модель родителя.
+    parent_lookups - соответствие полей родителя kwargs маршрута,
+     например {'id': 'review_id', 'title_id': 'title_id'}.
+    parent_field - имя внешнего ключа дочерней модели на родителя.
+    parent_conditions - постоянные условия на родителя, например
+     {'pending_deletion': False}.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+    parent_field = None
+    parent_conditions = {}
+
+    def get_parent_filter(self, prefix=''):
+        return {
+            **{
+                f'{prefix}{field}': self.kwargs[kwarg]
+                for field, kwarg in self.parent_lookups.items()
+            },
+            **{
+                f'{prefix}{field}': value
+                for field, value in self.parent_conditions.items()
+            },
+        }
+
+    def get_parent(self):
+        """Родитель из URL; запрашивается не больше одного раза за запрос."""
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model, **self.get_parent_filter()
+            )
+        return self._parent
+
+    def get_queryset(self):
+        return self.serializer_class.Meta.model.objects.filter(
+            **self.get_parent_filter(f'{self.parent_field}__')
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница у несуществующего родителя - это 404.
+            self.get_parent()
+        return page
+
+    def perform_create(self, serializer):
+        serializer.save(
+            author=self.request.user, **{self.parent_field: self.get_parent()}
+        )
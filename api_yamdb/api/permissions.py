@@ -13,7 +13,7 @@ class IsAuthorOrStaff(permissions.BasePermission):
             return True
         if request.user.is_authenticated:
             return (
-                request.user == obj.author
+                obj.author_id == request.user.pk
                 or request.user.is_superuser
                 or request.user.is_admin
                 or request.user.is_moderator
@@ -0,0 +1,177 @@
+"""
+Учёт SQL-запросов в пределах HTTP-запроса.
+
+QueryRecorder подключается через connection.execute_wrapper и записывает
+ каждый запрос вместе с его отпечатком - текстом SQL без параметров - и
+ источником: полем сериализатора, разрешением или методом вьюсета, из
+ которого запрос был выполнен. Повторы одного отпечатка - признак N+1.
+
+QueryInspectorMiddleware записывает запросы HTTP-запросов - всех или доли
+ QUERY_INSPECTOR['SAMPLE_RATE'] - и сверяет их с бюджетом вьюсета из
+ QUERY_INSPECTOR['BUDGETS']: в логах предупреждение, а с
+ QUERY_INSPECTOR['RAISE'] - исключение (так бюджеты проверяются в тестах).
+"""
+import logging
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.fields import Field
+from rest_framework.permissions import BasePermission
+from rest_framework.views import APIView
+
+logger = logging.getLogger('api.queries')
+
+PLACEHOLDERS = re.compile(r'%s(?:, %s)+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """Текст запроса без параметров; списки IN любой длины совпадают."""
+    return PLACEHOLDERS.sub('%s, ...', sql)
+
+
+def find_origin():
+    """
+    Ближайший по стеку вызовов источник запроса: поле сериализатора,
+     разрешение или вьюсет.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        # type(), а не isinstance(): isinstance обращается к __class__ и
+        # вычислил бы ленивый объект (например, request.user), выполнив
+        # новый запрос.
+        owner_type = type(owner)
+        if issubclass(owner_type, Field) and owner.field_name:
+            return f'{type(owner.parent).__name__}.{owner.field_name}'
+        if issubclass(owner_type, (BasePermission, APIView)):
+            return f'{owner_type.__name__}.{frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, записывающая выполненные запросы."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'fingerprint': fingerprint(sql),
+                'origin': find_origin(),
+                'time': time.perf_counter() - started,
+            })
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=None):
+        """
+        Отпечатки SELECT, выполненные не меньше threshold раз, с числом
+         повторов и источниками: {отпечаток: (повторов, {источник, ...})}.
+
+        Записи не учитываются: bulk_create пишет большие пакеты несколькими
+         одинаковыми INSERT, и это не N+1.
+        """
+        threshold = threshold or settings.QUERY_INSPECTOR['N_PLUS_ONE']
+        selects = [
+            query for query in self.queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+        counts = Counter(query['fingerprint'] for query in selects)
+        origins = defaultdict(set)
+        for query in selects:
+            origins[query['fingerprint']].add(query['origin'])
+        return {
+            sql: (count, origins[sql])
+            for sql, count in counts.items() if count >= threshold
+        }
+
+    def report(self):
+        lines = [f'Запросов к БД: {len(self)}']
+        for sql, (count, origins) in self.repeated().items():
+            sources = ', '.join(sorted(str(origin) for origin in origins))
+            lines.append(f'N+1 ({count} раз, {sources}): {sql[:200]}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries():
+    """Записывает запросы, выполненные внутри блока."""
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+
+def get_view_name(request):
+    """'<Вьюсет>.<action>' для вьюсетов, имя класса - для прочих view."""
+    match = getattr(request, 'resolver_match', None)
+    view_class = getattr(getattr(match, 'func', None), 'cls', None)
+    if view_class is None:
+        return None
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+def get_budget(view_name):
+    budgets = settings.QUERY_INSPECTOR['BUDGETS']
+    if view_name in budgets:
+        return budgets[view_name]
+    return budgets.get(view_name.split('.')[0])
+
+
+class QueryInspectorMiddleware:
+    """Проверяет число запросов и повторы запросов для каждого запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = settings.QUERY_INSPECTOR
+        if (
+            not inspector['ENABLED']
+            or random.random() >= inspector['SAMPLE_RATE']
+        ):
+            return self.get_response(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        self.inspect(request, recorder)
+        return response
+
+    def inspect(self, request, recorder):
+        view_name = get_view_name(request)
+        if view_name is None:
+            return
+        problems = []
+        budget = get_budget(view_name)
+        if budget is not None and len(recorder) > budget:
+            problems.append(f'бюджет {budget} превышен')
+        if recorder.repeated():
+            problems.append('повторяющиеся запросы')
+        if not problems:
+            return
+        message = (
+            f'{request.method} {request.path} ({view_name}): '
+            f'{", ".join(problems)}\n{recorder.report()}'
+        )
+        if settings.QUERY_INSPECTOR['RAISE']:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
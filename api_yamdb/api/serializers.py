@@ -3,10 +3,18 @@ from datetime import datetime
 from django.contrib.auth.tokens import default_token_generator
 from django.core.validators import RegexValidator
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
-from reviews.models import Comment, Category, Genre, Title, Review
+from api.fast import FastSerializer
+from reviews.models import (
+    SCORES, Comment, Category, Genre, GenreTitle, Title, Review,
+    histogram_field,
+)
 
 User = get_user_model()
 
@@ -42,12 +50,87 @@ class TitleReadSerializer(serializers.ModelSerializer):
                   )
 
 
+class ScoreHistogramSerializer(serializers.Serializer):
+    """Гистограмма оценок произведения: {"1": число отзывов, ...}."""
+
+    def get_fields(self):
+        return {
+            str(score): serializers.IntegerField(
+                source=histogram_field(score), read_only=True
+            )
+            for score in SCORES
+        }
+
+
+class TitleDetailSerializer(TitleReadSerializer):
+    """Произведение с гистограммой оценок."""
+
+    score_histogram = ScoreHistogramSerializer(source='*', read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = (*TitleReadSerializer.Meta.fields, 'score_histogram')
+
+
+class TitleHistogramSerializer(serializers.ModelSerializer):
+    """Гистограмма оценок в пакетной выдаче."""
+
+    score_histogram = ScoreHistogramSerializer(source='*', read_only=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'score_histogram')
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """Список slug, по которому все объекты выбираются одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        slugs = []
+        for item in data:
+            if not isinstance(item, (str, int)):
+                child.fail('invalid')
+            slugs.append(smart_str(item))
+        objects = {
+            smart_str(getattr(obj, child.slug_field)): obj
+            for obj in child.get_queryset().filter(
+                **{f'{child.slug_field}__in': set(slugs)}
+            )
+        }
+        for slug in slugs:
+            if slug not in objects:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
+
+
+class BatchSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при many=True выбирает объекты одним
+     запросом, а не запросом на каждый slug.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
     )
-    genre = serializers.SlugRelatedField(
+    genre = BatchSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True,
@@ -67,6 +150,47 @@ class TitleWriteSerializer(serializers.ModelSerializer):
             raise ValueError('Произведение не может быть из будущего')
         return data
 
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = validated_data.pop('genre', [])
+        title = super().create(validated_data)
+        self.set_genres(title, genres, created=True)
+        return title
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            self.set_genres(title, genres)
+        return title
+
+    @staticmethod
+    def set_genres(title, genres, created=False):
+        """
+        Приводит жанры произведения к genres: лишние связи удаляются одним
+         запросом, недостающие добавляются одним bulk_create. Кэш ответов
+         сбрасывается сохранением самого произведения: create и update
+         выполняются в одной транзакции, поэтому сброс происходит уже после
+         изменения жанров.
+        """
+        wanted = {genre.pk: genre for genre in genres}
+        current = set() if created else set(
+            GenreTitle.objects.filter(title=title)
+            .values_list('genre_id', flat=True)
+        )
+        removed = current - wanted.keys()
+        if removed:
+            GenreTitle.objects.filter(
+                title=title, genre_id__in=removed
+            ).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for pk, genre in wanted.items() if pk not in current
+        )
+        if hasattr(title, '_prefetched_objects_cache'):
+            title._prefetched_objects_cache.pop('genre', None)
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализация отзывов."""
@@ -107,6 +231,29 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('review', 'author')
 
 
+class BulkReviewSerializer(serializers.Serializer):
+    """
+    Отзыв в пакетной загрузке. Произведение и автор (по умолчанию - тот,
+     кто загружает) проверяются сразу для всего пакета.
+    """
+
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150, required=False)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        min_value=Review.MIN_SCORE_VALUE,
+        max_value=Review.MAX_SCORE_VALUE,
+    )
+
+
+class BulkCommentSerializer(serializers.Serializer):
+    """Комментарий в пакетной загрузке."""
+
+    review = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150, required=False)
+    text = serializers.CharField()
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Сериализация работы с пользователями."""
 
@@ -141,16 +288,24 @@ class SignupSerializer(serializers.ModelSerializer):
         """
         Запрет на использование 'me' в качестве имени пользователя.
         Проверки на использование неуникального email и username.
+
+        Пользователи с таким username или email выбираются одним запросом;
+         если это один и тот же пользователь, он сохраняется в
+         existing_user и повторно не запрашивается.
         """
         email = attrs.get('email')
         username = attrs.get('username')
-        user_to_username = User.objects.filter(username=username).exists()
-        user_to_email = User.objects.filter(email=email).exists()
 
         if username.lower() == 'me':
             raise serializers.ValidationError(
                 'Использовать "me" в качестве имени пользователя запрещено!'
             )
+        matches = list(User.objects.filter(
+            Q(username=username) | Q(email=email)
+        )[:2])
+        user_to_username = any(user.username == username for user in matches)
+        user_to_email = any(user.email == email for user in matches)
+
         if user_to_email and not user_to_username:
             raise serializers.ValidationError(
                 f'Пользователь с email {email} уже существует!'
@@ -159,8 +314,22 @@ class SignupSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 f'Имя пользователя "{username}" уже занято!'
             )
+        if len(matches) > 1:
+            raise serializers.ValidationError(
+                f'Имя пользователя "{username}" и email {email} '
+                f'принадлежат разным пользователям!'
+            )
+        if matches and matches[0].pending_deletion:
+            raise serializers.ValidationError(
+                f'Пользователь "{username}" удаляется, повторите '
+                f'регистрацию позже.'
+            )
+        self.existing_user = matches[0] if matches else None
         return attrs
 
+    def create(self, validated_data):
+        return self.existing_user or super().create(validated_data)
+
 
 class ReceiveTokenSerializer(serializers.Serializer):
     """Сериализация получения jwt-токена."""
@@ -174,3 +343,33 @@ class ReceiveTokenSerializer(serializers.Serializer):
         if not default_token_generator.check_token(user, confirmation_code):
             raise serializers.ValidationError('Неверный код подтверждения!')
         return attrs
+
+
+class CategoryFastSerializer(FastSerializer):
+    serializer_class = CategorySerializer
+
+
+class GenreFastSerializer(FastSerializer):
+    serializer_class = GenreSerializer
+
+
+class TitleFastSerializer(FastSerializer):
+    serializer_class = TitleReadSerializer
+
+
+class TitleDetailFastSerializer(FastSerializer):
+    serializer_class = TitleDetailSerializer
+
+
+class TitleHistogramFastSerializer(FastSerializer):
+    serializer_class = TitleHistogramSerializer
+
+
+class ReviewFastSerializer(FastSerializer):
+    serializer_class = ReviewSerializer
+    string_sources = {'author': 'author__username'}
+
+
+class CommentFastSerializer(FastSerializer):
+    serializer_class = CommentSerializer
+    string_sources = {'author': 'author__username'}
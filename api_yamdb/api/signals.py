@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save
+)
+from django.dispatch import receiver
+
+from api.authentication import User, forget_user_state
+from api.cache import invalidate
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title
+)
+from reviews.signals import catalogue_rebuilt, rows_loaded, rows_purged
+
+# Какие закэшированные ответы устаревают при записи в модель: произведения
+# содержат жанры, категорию и рейтинг, поэтому зависят от всех моделей.
+INVALIDATES = {
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+}
+NAMESPACES = sorted({
+    namespace
+    for namespaces in INVALIDATES.values()
+    for namespace in namespaces
+})
+
+
+def author_namespaces(user_ids):
+    """Списки отзывов и комментариев, в которых выводятся имена авторов."""
+    titles = Review.objects.filter(author__in=user_ids).order_by(
+    ).values_list('title_id', flat=True).distinct()
+    reviews = Comment.objects.filter(author__in=user_ids).order_by(
+    ).values_list('review_id', flat=True).distinct()
+    return [
+        *(f'reviews:{pk}' for pk in titles),
+        *(f'comments:{pk}' for pk in reviews),
+    ]
+
+
+def schedule_invalidation(namespaces):
+    """
+    Версия меняется после фиксации транзакции: иначе параллельный запрос
+     мог бы закэшировать ещё старые данные уже под новой версией.
+    """
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    schedule_invalidation(INVALIDATES[sender])
+
+
+for model in INVALIDATES:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_title_reviews(sender, instance, **kwargs):
+    namespaces = [f'reviews:{instance.title_id}']
+    if kwargs['signal'] is post_delete:
+        namespaces.append(f'comments:{instance.pk}')
+    schedule_invalidation(namespaces)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_review_comments(sender, instance, **kwargs):
+    schedule_invalidation([f'comments:{instance.review_id}'])
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_deleted_title_reviews(sender, instance, **kwargs):
+    # Отзывы помеченного к удалению произведения уже не отдаются.
+    if kwargs['signal'] is post_delete or instance.pending_deletion:
+        schedule_invalidation([
+            f'reviews:{instance.pk}', f'title:{instance.pk}'
+        ])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        schedule_invalidation(INVALIDATES[GenreTitle])
+
+
+@receiver(rows_purged)
+@receiver(rows_loaded)
+def invalidate_bulk_rows(sender, pks, parents, **kwargs):
+    if sender is Review:
+        schedule_invalidation([
+            *INVALIDATES[Review],
+            *(f'reviews:{pk}' for pk in parents),
+            *(f'comments:{pk}' for pk in pks),
+        ])
+    elif sender is Comment:
+        schedule_invalidation([f'comments:{pk}' for pk in parents])
+    elif sender is User and kwargs['signal'] is rows_loaded:
+        schedule_invalidation(author_namespaces(pks))
+    elif sender in INVALIDATES:
+        schedule_invalidation(INVALIDATES[sender])
+
+
+@receiver(catalogue_rebuilt)
+def invalidate_catalogue(sender, **kwargs):
+    schedule_invalidation(NAMESPACES)
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # Через __dict__, чтобы не загружать отложенное поле.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_content(sender, instance, created, raw, **kwargs):
+    """
+    Имя автора выводится в отзывах и комментариях, поэтому его смена
+     меняет версии их списков.
+    """
+    previous = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or raw or previous in (None, instance.username):
+        return
+    schedule_invalidation(author_namespaces([instance.pk]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user_state(sender, instance, **kwargs):
+    """Смена роли, блокировка и удаление сразу видны аутентификации."""
+    transaction.on_commit(lambda: forget_user_state(instance.pk))
@@ -0,0 +1,184 @@
+"""
+Ограничение частоты запросов к эндпоинтам аутентификации.
+
+Каждый ключ (IP-адрес клиента или имя пользователя из тела запроса) имеет
+ корзину токенов: ёмкость корзины - допустимый всплеск запросов, а
+ пополняется она равномерно, так что за период восстанавливается целиком.
+ Запрос забирает один токен; если токенов нет, DRF отвечает 429 с
+ заголовком Retry-After ещё до разбора данных и обращений к базе.
+
+Состояние корзин хранит бэкенд из AUTH_THROTTLE['BACKEND']:
+ LocalBucketBackend - память процесса, для одного узла;
+ CacheBucketBackend - общий кэш Django (например, Redis), для нескольких.
+"""
+import threading
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+BUCKET_KEY = 'throttle:{scope}:{ident}'
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): ёмкость корзины и период её пополнения."""
+    capacity, period = rate.split('/')
+    return int(capacity), PERIODS[period[0]]
+
+
+def refill(tokens, updated, capacity, period, now):
+    return min(capacity, tokens + (now - updated) * capacity / period)
+
+
+class BaseBucketBackend:
+    """Интерфейс хранилища корзин токенов."""
+
+    def consume(self, key, capacity, period):
+        """
+        Забирает токен из корзины key. Возвращает 0, если запрос разрешён,
+         иначе - сколько секунд ждать следующего токена.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Возвращает все корзины в исходное, полное состояние."""
+        raise NotImplementedError
+
+
+class LocalBucketBackend(BaseBucketBackend):
+    """
+    Корзины в памяти процесса. Полные корзины ничем не отличаются от
+     отсутствующих, поэтому при росте словаря они выбрасываются.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, period))
+            tokens = refill(tokens, updated, capacity, period, now)
+            wait = 0
+            if tokens < 1:
+                wait = (1 - tokens) * period / capacity
+            else:
+                tokens -= 1
+            self.buckets[key] = (tokens, now, period)
+            if len(self.buckets) > self.max_keys:
+                self.prune(now)
+            return wait
+
+    def prune(self, now):
+        # За свой период корзина восстанавливается целиком.
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items()
+            if now - bucket[1] < bucket[2]
+        }
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketBackend(BaseBucketBackend):
+    """
+    Корзины в кэше Django, общем для всех узлов. Корзина хранится не
+     дольше периода пополнения: к этому времени она снова была бы полной.
+
+    Чтение и запись корзины не атомарны, поэтому при одновременных запросах
+     с одного ключа может пройти на несколько запросов больше лимита - для
+     защиты от перебора этого достаточно. Для корзин лучше завести
+     отдельный кэш: reset очищает его целиком.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, capacity, period):
+        now = time.time()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = refill(tokens, updated, capacity, period, now)
+        wait = 0
+        if tokens < 1:
+            wait = (1 - tokens) * period / capacity
+        else:
+            tokens -= 1
+        self.cache.set(key, (tokens, now), timeout=period)
+        return wait
+
+    def reset(self):
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_bucket_backend():
+    options = settings.AUTH_THROTTLE
+    return import_string(options['BACKEND'])(**options.get('OPTIONS', {}))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый класс ограничений: scope задаёт лимит из
+     AUTH_THROTTLE['RATES'], get_ident - ключ корзины. Лимит None или ключ
+     None отключают проверку.
+    """
+
+    scope = None
+
+    def allow_request(self, request, view):
+        rate = settings.AUTH_THROTTLE['RATES'].get(self.scope)
+        ident = self.get_ident(request)
+        if rate is None or ident is None:
+            return True
+        capacity, period = parse_rate(rate)
+        self.retry_after = get_bucket_backend().consume(
+            BUCKET_KEY.format(scope=self.scope, ident=ident),
+            capacity, period,
+        )
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class UsernameThrottleMixin:
+    """
+    Ключ корзины - имя пользователя из тела запроса; если тело не объект
+     (например, JSON-массив), - IP-адрес клиента.
+    """
+
+    def get_ident(self, request):
+        if not isinstance(request.data, Mapping):
+            return super().get_ident(request)
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
+
+
+class SignupIPThrottle(TokenBucketThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottleMixin, TokenBucketThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(TokenBucketThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottleMixin, TokenBucketThrottle):
+    scope = 'token_username'
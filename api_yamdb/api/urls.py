@@ -1,9 +1,10 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import SimpleRouter
 
+from api.bulk import BulkCommentView, BulkReviewView
 from api.views import (
     ReviewViewSet, CommentViewSet, TitleViewSet, GenreViewSet,
-    CategoryViewSet, ReceiveTokenView, SignupView, UserViewSet
+    CategoryViewSet, ExportView, ReceiveTokenView, SignupView, UserViewSet
 )
 
 app_name = 'api'
@@ -40,7 +41,16 @@ auth_patterns = [
     path('signup/', SignupView.as_view()),
     path('token/', ReceiveTokenView.as_view()),
 ]
+bulk_patterns = [
+    path('reviews/', BulkReviewView.as_view()),
+    path('comments/', BulkCommentView.as_view()),
+]
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(auth_patterns)),
+    path('v1/bulk/', include(bulk_patterns)),
+    re_path(
+        r'^v1/export/(?P<dataset>\w+)\.(?P<export_format>csv|ndjson)$',
+        ExportView.as_view(),
+    ),
 ]
@@ -1,31 +1,34 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from api.authentication import add_user_claims
 from users.models import CustomUser
+from users.outbox import enqueue_email
 
 
 def confirm_email_sendler(email: str, user: CustomUser) -> None:
     """
-    Функция генерирует 39-значный код и отправляет его на почту указанную
-     пользователем.
+    Функция генерирует 39-значный код и ставит письмо с ним в очередь
+     на отправку на почту указанную пользователем.
     """
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_email(
         subject='Код подтверждения',
         message=(
             f'Ваш код регистрации учетной записи: {confirmation_code}.'
         ),
         from_email=settings.YAMDB_EMAIL,
-        recipient_list=(email,),
-        fail_silently=False,
+        recipient=email,
     )
 
 
 def get_auth_jwt_token(user: CustomUser) -> dict[str, str]:
-    """Генератор jwt-токена."""
-    token = RefreshToken.for_user(user)
+    """
+    Генератор jwt-токена. Токен содержит роль пользователя для
+     StatelessJWTAuthentication.
+    """
+    token = add_user_claims(RefreshToken.for_user(user), user)
     return {
         'refresh': str(token),
         'access': str(token.access_token),
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions, status
@@ -12,16 +13,32 @@ from rest_framework.mixins import (
 )
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.generics import CreateAPIView
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
 from api.serializers import (
     CommentSerializer, CategorySerializer, GenreSerializer,
     ReceiveTokenSerializer, ReviewSerializer, SignupSerializer,
-    UserSerializer, TitleReadSerializer, TitleWriteSerializer
+    UserSerializer, TitleReadSerializer, TitleWriteSerializer,
+    TitleDetailSerializer, TitleHistogramSerializer,
+    CategoryFastSerializer, CommentFastSerializer, GenreFastSerializer,
+    ReviewFastSerializer, TitleFastSerializer, TitleDetailFastSerializer,
+    TitleHistogramFastSerializer,
 )
+from api.cache import CachedListMixin, CachedRetrieveMixin
+from api.conditional import ConditionalGetMixin
+from api.fast import FastListMixin, FastRetrieveMixin
+from api.nested import ParentLookupMixin
+from api.pagination import OptionalCursorPagination
 from api.permissions import IsAuthorOrStaff, ReadOnly, IsAdmin
+from api.throttling import (
+    SignupIPThrottle, SignupUsernameThrottle, TokenIPThrottle,
+    TokenUsernameThrottle,
+)
 from api.utils import confirm_email_sendler, get_auth_jwt_token
-from api.filters import TitleCustomFilter
+from api.filters import TitleCustomFilter, TitleOrderingFilter
+from reviews.deletion import mark_for_deletion
+from reviews.export import DATASETS, export
 from reviews.models import Title, Review, Genre, Category
 
 
@@ -37,93 +54,141 @@ class ListCreateDestroyViewSet(
     pass
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(
+    CachedListMixin, FastListMixin, ListCreateDestroyViewSet
+):
     """ViewSet модели Genre."""
 
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    fast_serializer_class = GenreFastSerializer
     filter_backends = (DjangoFilterBackend, SearchFilter)
     search_fields = ('name',)
     lookup_field = 'slug'
     permission_classes = (ReadOnly | IsAdmin,)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(
+    CachedListMixin, FastListMixin, ListCreateDestroyViewSet
+):
     """ViewSet модели Category."""
 
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    fast_serializer_class = CategoryFastSerializer
     filter_backends = (DjangoFilterBackend, SearchFilter)
     search_fields = ('name',)
     lookup_field = 'slug'
     permission_classes = (ReadOnly | IsAdmin,)
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    FastListMixin,
+    FastRetrieveMixin,
+    ModelViewSet,
+):
     """ViewSet модели Title."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).all()
-    filter_backends = (DjangoFilterBackend,)
+    cache_namespace = 'titles'
+    validator_namespaces = ('titles',)
+    queryset = Title.objects.filter(
+        pending_deletion=False
+    ).select_related('category').prefetch_related('genre')
+    fast_serializer_class = TitleFastSerializer
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleCustomFilter
+    ordering_fields = (
+        'name', 'year', 'rating', 'weighted_rating', 'rating_count'
+    )
     lookup_field = 'id'
     permission_classes = (ReadOnly | IsAdmin,)
 
     def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
+        if self.action == 'histograms':
+            return TitleHistogramSerializer
         if self.request.method == 'GET':
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_fast_serializer_class(self):
+        if self.action == 'retrieve':
+            return TitleDetailFastSerializer
+        if self.action == 'histograms':
+            return TitleHistogramFastSerializer
+        return self.fast_serializer_class
+
+    def perform_destroy(self, instance):
+        # Отзывы и комментарии удаляются в фоне (reviews.deletion).
+        mark_for_deletion(instance)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def histograms(self, request, *args, **kwargs):
+        """
+        Гистограммы оценок страницы произведений: те же фильтры, сортировка
+         и пагинация, что у списка, например ?ids=1,2,3.
+        """
+        return self.list(request, *args, **kwargs)
+
+
+class ReviewViewSet(
+    ParentLookupMixin, ConditionalGetMixin, FastListMixin, FastRetrieveMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет отзывов."""
 
+    validator_namespaces = ('reviews:{title_id}',)
     serializer_class = ReviewSerializer
+    fast_serializer_class = ReviewFastSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrStaff,
     )
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
+    parent_field = 'title'
+    parent_conditions = {'pending_deletion': False}
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
-
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        return super().get_queryset().select_related('author')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ParentLookupMixin, ConditionalGetMixin, FastListMixin, FastRetrieveMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет комментариев."""
 
+    # title:{title_id} меняется, когда произведение помечено к удалению и
+    # его комментарии перестают отдаваться.
+    validator_namespaces = ('comments:{review_id}', 'title:{title_id}')
     serializer_class = CommentSerializer
+    fast_serializer_class = CommentFastSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrStaff,
     )
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
+    parent_field = 'review'
+    parent_conditions = {'title__pending_deletion': False}
 
     def get_queryset(self):
-        review = get_object_or_404(
-            klass=Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
-
-    def perform_create(self, serializer):
-        review = get_object_or_404(
-            klass=Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        return super().get_queryset().select_related('author')
 
 
 class UserViewSet(ModelViewSet):
     """Работа администратора и superuser с пользователями."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(pending_deletion=False)
     serializer_class = UserSerializer
     filter_backends = (SearchFilter,)
     search_fields = ('username',)
@@ -134,8 +199,16 @@ class UserViewSet(ModelViewSet):
     def perform_update(self, serializer):
         return serializer.save(role=self.request.user.role)
 
+    def perform_destroy(self, instance):
+        # Отзывы и комментарии удаляются в фоне (reviews.deletion).
+        mark_for_deletion(instance)
+
     def get_instance(self):
-        return self.request.user
+        user = self.request.user
+        if getattr(user, 'is_token_user', False):
+            # Пользователь собран из токена и не содержит данных профиля.
+            return get_object_or_404(User, pk=user.pk)
+        return user
 
     @action(
         methods=['get', 'patch'],
@@ -166,11 +239,15 @@ class SignupView(CreateAPIView):
     queryset = User.objects.all()
     serializer_class = SignupSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (SignupIPThrottle, SignupUsernameThrottle)
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
+        # Пользователь и письмо с кодом фиксируются вместе; само письмо
+        # отправляет обработчик очереди (users.outbox).
         serializer = SignupSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, create = User.objects.get_or_create(**serializer.validated_data)
+        user = serializer.save()
         confirm_email_sendler(
             email=user.email,
             user=user
@@ -188,6 +265,7 @@ class ReceiveTokenView(CreateAPIView):
     queryset = User.objects.all()
     serializer_class = ReceiveTokenSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def create(self, request, *args, **kwargs):
         """Создание JWT-токена."""
@@ -199,3 +277,28 @@ class ReceiveTokenView(CreateAPIView):
         )
         token = get_auth_jwt_token(user)
         return Response(token, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка набора данных в формате load_csv:
+     GET /api/v1/export/<набор>.<csv|ndjson>. Пользователи не выгружаются.
+    """
+
+    permission_classes = (IsAdmin,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, dataset, export_format):
+        if dataset not in DATASETS or dataset == 'users':
+            raise Http404
+        response = StreamingHttpResponse(
+            export(dataset, export_format),
+            content_type=self.content_types[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{export_format}"'
+        )
+        return response
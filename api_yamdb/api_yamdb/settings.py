@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.querylog.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,6 +93,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 
+    # api.authentication.StatelessJWTAuthentication избавляет от загрузки
+    # пользователя из БД на каждом запросе (см. STATELESS_JWT).
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -104,9 +108,135 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш состояния пользователей для StatelessJWTAuthentication: смена роли или
+# блокировка в другом процессе применяется не позже чем через STATE_TIMEOUT
+# секунд, в текущем - сразу.
+STATELESS_JWT = {
+    'CACHE_ALIAS': 'default',
+    'STATE_TIMEOUT': 60,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 YAMDB_EMAIL = 'registration@yambd.ru'
 
+# Очередь исходящих писем (users.outbox). Письма отправляет команда
+# send_emails; при EAGER очередь разбирается сразу в процессе запроса.
+EMAIL_OUTBOX = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+    'LEASE': 300,
+    'POLL_INTERVAL': 5,
+}
+
+# Отложенное удаление произведений и пользователей (reviews.deletion).
+# Без EAGER помеченные записи удаляет `python manage.py purge_deleted`.
+DEFERRED_DELETION = {
+    'EAGER': False,
+    'BATCH_SIZE': 500,
+    'POLL_INTERVAL': 5,
+}
+
 CSV_PATH = 'static/data/'
+
+TITLE_SEARCH_BACKEND = 'reviews.search.SQLiteFTSTitleSearchBackend'
+
+# Байесовский рейтинг произведений (Title.weighted_rating): средняя оценка,
+# к которой добавлено WEIGHT фиктивных отзывов с оценкой MEAN. После
+# изменения нужно выполнить `python manage.py rebuild_ratings`.
+TITLE_RATING_PRIOR = {
+    'MEAN': 5.5,
+    'WEIGHT': 10,
+}
+
+# Хранилище кэша ответов каталога: locmem, file, redis (нужен пакет
+# django-redis и совместимый с Redis сервер по API_CACHE_LOCATION) или
+# dummy - кэширование отключено.
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'locmem')
+API_CACHE_BACKENDS = {
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('API_CACHE_LOCATION', BASE_DIR / 'cache'),
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv(
+            'API_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'
+        ),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': API_CACHE_BACKENDS[API_CACHE_BACKEND],
+}
+
+# Ограничение частоты запросов к эндпоинтам аутентификации (api.throttling).
+# Лимит '10/min' - корзина на 10 запросов, пополняемая за минуту; None
+# отключает ограничение. Для нескольких узлов нужен общий бэкенд:
+# 'api.throttling.CacheBucketBackend' с OPTIONS {'alias': <кэш>}.
+AUTH_THROTTLE = {
+    'BACKEND': 'api.throttling.LocalBucketBackend',
+    'OPTIONS': {},
+    'RATES': {
+        'signup_ip': '20/min',
+        'signup_username': '5/min',
+        'token_ip': '30/min',
+        'token_username': '10/min',
+    },
+}
+
+# Учёт SQL-запросов по HTTP-запросам (api.querylog). Превышение бюджета
+# вьюсета ('<Вьюсет>.<action>' или '<Вьюсет>') и запросы, повторённые
+# N_PLUS_ONE раз и больше, пишутся в лог api.queries, а при RAISE вызывают
+# исключение. Бюджеты учитывают запрос пользователя при аутентификации.
+# SAMPLE_RATE - доля проверяемых запросов: без DEBUG проверяется только
+# выборка, чтобы учёт не замедлял каждый запрос.
+QUERY_INSPECTOR = {
+    'ENABLED': True,
+    'RAISE': False,
+    'SAMPLE_RATE': 1.0 if DEBUG else 0.05,
+    'N_PLUS_ONE': 5,
+    'BUDGETS': {
+        'CategoryViewSet.list': 3,
+        'GenreViewSet.list': 3,
+        'TitleViewSet.list': 4,
+        'TitleViewSet.retrieve': 3,
+        'TitleViewSet.histograms': 2,
+        'ReviewViewSet.list': 3,
+        'ReviewViewSet.retrieve': 2,
+        'CommentViewSet.list': 3,
+        'CommentViewSet.retrieve': 2,
+    },
+}
+
+# Наибольшее число элементов в одном запросе пакетной загрузки (api.bulk).
+BULK_CREATE_MAX_ITEMS = 10000
+
+# Чтение каталога, отзывов и комментариев через быстрые сериализаторы
+# (api.fast); False возвращает обычные сериализаторы DRF.
+FAST_READ_SERIALIZERS = True
+
+# VERSION_TIMEOUT - срок хранения версий пространств имён: по его истечении
+# версия начинается заново, и ответы, закэшированные процессом, который не
+# видел записи, не переживают этот срок. ETag и Last-Modified строятся по
+# версиям, поэтому выдаются (CONDITIONAL_GET) только с общим для всех
+# процессов хранилищем: в locmem запись меняет версии лишь в одном процессе.
+API_RESPONSE_CACHE = {
+    'ALIAS': 'api',
+    'TIMEOUT': 300,
+    'VERSION_TIMEOUT': 3600,
+    'CONDITIONAL_GET': API_CACHE_BACKEND in ('file', 'redis'),
+}
@@ -1,6 +1,45 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
 
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import get_search_backend
+
+
+class LimitedCountPaginator(Paginator):
+    """
+    Paginator для больших таблиц: строки считаются не дальше count_limit,
+     поэтому COUNT(*) не обходит всю таблицу.
+
+    Если строк больше, число строк таблицы без фильтров оценивается по
+     наибольшему первичному ключу (последние страницы могут оказаться
+     пустыми), а отфильтрованный список показывает первые count_limit строк.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        count = queryset.order_by()[:self.count_limit + 1].count()
+        if count <= self.count_limit:
+            return count
+        if queryset.query.where:
+            return self.count_limit
+        return queryset.aggregate(last=Max('pk'))['last']
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Список записей большой таблицы: без полного подсчёта строк и в порядке
+     первичного ключа, который читается по индексу.
+    """
+
+    paginator = LimitedCountPaginator
+    show_full_result_count = False
+    list_per_page = 100
+    ordering = ('-id',)
 
 
 @admin.register(Category)
@@ -15,12 +54,13 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     """Администрирование комментариев произведения."""
 
     list_display = ('author', 'review', 'text', 'pub_date')
-    list_editable = ('author', 'review',)
-    search_fields = ('author', 'text',)
+    list_select_related = ('author', 'review')
+    raw_id_fields = ('author', 'review')
+    search_fields = ('author__username__exact',)
     list_display_links = ('text',)[:10]
 
 
@@ -36,21 +76,39 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     """Администрированеи отзывов произведений."""
 
     list_display = ('author', 'title', 'text', 'score', 'pub_date')
-    list_editable = ('author', 'text', 'score',)
-    search_fields = ('author', 'title', 'text', 'score',)
+    list_editable = ('text', 'score',)
+    list_select_related = ('author', 'title')
+    raw_id_fields = ('author', 'title')
+    search_fields = ('author__username__exact',)
     list_display_links = ('title',)[:10]
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
-    """Администрирование произведений."""
+class TitleAdmin(LargeTableAdmin):
+    """
+    Администрирование произведений.
+
+    Поиск идёт через поисковый индекс произведений (reviews.search), а не
+     через LIKE по search_fields.
+    """
 
     list_display = (
         'name', 'description', 'year', 'category',)
-    list_editable = ('description', 'year', 'category',)
-    search_fields = ('name', 'genre', 'category',)
+    list_editable = ('description', 'year',)
+    list_select_related = ('category',)
+    raw_id_fields = ('category',)
+    search_fields = ('name',)
     list_display_links = ('name',)[:10]
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        # Только отбор: порядок строк задаёт список, а не релевантность.
+        matches = get_search_backend().search(
+            self.model.objects.all(), search_term
+        )
+        return queryset.filter(pk__in=matches.values('pk')), False
@@ -0,0 +1,151 @@
+"""
+Отложенное удаление произведений и пользователей.
+
+Model.delete() загружает в память все зависимые отзывы, комментарии и
+ связи с жанрами и отправляет сигнал на каждую запись, и всё это в одной
+ транзакции. Для популярного произведения или активного пользователя это
+ долгий запрос и долгая блокировка. Поэтому API только помечает запись
+ (pending_deletion) и сразу отвечает, а обработчик
+ `python manage.py purge_deleted` удаляет зависимые записи пачками, каждую
+ в своей транзакции и без загрузки объектов, и затем саму запись.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from reviews.models import Comment, GenreTitle, Review, Title, User
+from reviews.signals import rows_purged
+
+
+def mark_for_deletion(instance):
+    """
+    Помечает произведение или пользователя к удалению; пользователь сразу
+     блокируется. При DEFERRED_DELETION['EAGER'] эта запись удаляется
+     после фиксации транзакции, в текущем процессе.
+    """
+    instance.pending_deletion = True
+    update_fields = ['pending_deletion']
+    if isinstance(instance, User):
+        instance.is_active = False
+        update_fields.append('is_active')
+    instance.save(update_fields=update_fields)
+    if settings.DEFERRED_DELETION['EAGER']:
+        model, pk = type(instance), instance.pk
+        transaction.on_commit(lambda: purge_marked(model, pks=[pk]))
+
+
+def delete_rows(model, field_name, values, using=DEFAULT_DB_ALIAS):
+    """
+    Удаляет записи model, у которых поле field_name ('pk' - первичный
+     ключ) равно одному из values, прямым DELETE: без загрузки объектов,
+     сигналов и каскада Django. Возвращает число удалённых записей.
+    """
+    connection = connections[using]
+    if field_name == 'pk':
+        field = model._meta.pk
+    else:
+        field = model._meta.get_field(field_name)
+    quote_name = connection.ops.quote_name
+    values = list(values)
+    chunk_size = connection.features.max_query_params or len(values) or 1
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            cursor.execute(
+                f'DELETE FROM {quote_name(model._meta.db_table)} '
+                f'WHERE {quote_name(field.column)} IN '
+                f'({", ".join(["%s"] * len(chunk))})',
+                chunk,
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def purge_rows(queryset, parent_field, batch_size):
+    """
+    Удаляет записи queryset пачками по batch_size, каждую в своей
+     транзакции, и возвращает число удалённых записей.
+
+    Сигналы моделей не отправляются: рейтинги пересчитываются здесь, а кэш
+     сбрасывается по сигналу rows_purged.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by().values_list('pk', parent_field)[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                return deleted
+            pks = [pk for pk, _ in rows]
+            parents = {parent for _, parent in rows}
+            if model is Review:
+                # Комментарии, добавленные к отзывам уже после того, как
+                # их комментарии были удалены предыдущим шагом.
+                delete_rows(Comment, 'review', pks, queryset.db)
+            delete_rows(model, 'pk', pks, queryset.db)
+            if model is Review:
+                Title.objects.filter(pk__in=parents).recalculate_ratings()
+            rows_purged.send(sender=model, pks=pks, parents=parents)
+        deleted += len(rows)
+
+
+def purge_title(title, batch_size):
+    """Удаляет отзывы, комментарии и связи с жанрами, затем произведение."""
+    purge_rows(
+        Comment.objects.filter(review__title=title), 'review_id', batch_size
+    )
+    purge_rows(Review.objects.filter(title=title), 'title_id', batch_size)
+    purge_rows(
+        GenreTitle.objects.filter(title=title), 'title_id', batch_size
+    )
+    title.delete()
+
+
+def purge_user(user, batch_size):
+    """
+    Удаляет комментарии пользователя, комментарии к его отзывам и сами
+     отзывы, пересчитывая рейтинги произведений, затем пользователя.
+    """
+    purge_rows(Comment.objects.filter(author=user), 'review_id', batch_size)
+    purge_rows(
+        Comment.objects.filter(review__author=user), 'review_id', batch_size
+    )
+    purge_rows(Review.objects.filter(author=user), 'title_id', batch_size)
+    user.delete()
+
+
+PURGERS = {
+    Title: purge_title,
+    User: purge_user,
+}
+
+
+def purge_marked(model, pks=None, batch_size=None):
+    """
+    Удаляет помеченные к удалению произведения или пользователей (model),
+     а если передан pks - только записи с этими первичными ключами.
+     Возвращает число удалённых записей.
+    """
+    batch_size = batch_size or settings.DEFERRED_DELETION['BATCH_SIZE']
+    marked = model.objects.filter(pending_deletion=True)
+    if pks is not None:
+        marked = marked.filter(pk__in=pks)
+    instances = list(marked)
+    for instance in instances:
+        PURGERS[model](instance, batch_size)
+    return len(instances)
+
+
+def purge_pending(batch_size=None):
+    """
+    Удаляет все помеченные произведения и пользователей и возвращает пару
+     (удалено произведений, удалено пользователей).
+    """
+    return (
+        purge_marked(Title, batch_size=batch_size),
+        purge_marked(User, batch_size=batch_size),
+    )
@@ -0,0 +1,138 @@
+"""
+Выгрузка данных в формате, который читает команда load_csv.
+
+Каждый набор данных соответствует одному CSV-файлу load_csv, с теми же
+ колонками; выгрузка titles дополнительно содержит описание и рейтинг.
+ Строки читаются из базы через iterator(chunk_size), а форматируются и
+ отдаются по одной, поэтому расход памяти не зависит от размера каталога.
+ Записи, ждущие удаления (pending_deletion), и зависящие от них строки в
+ выгрузку не попадают, как и в ответы API.
+"""
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, User
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Набор данных: (модель, ((колонка файла, поле модели), ...)).
+DATASETS = {
+    'users': (User, (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('role', 'role'),
+        ('bio', 'bio'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'category': (Category, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genre': (Genre, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'titles': (Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('category', 'category_id'),
+        ('description', 'description'),
+        ('rating', 'rating'),
+    )),
+    'genre_title': (GenreTitle, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'review': (Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comment, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('pub_date', 'pub_date'),
+    )),
+}
+# Условия, скрывающие записи, которые ждут удаления, и строки, ссылающиеся
+# на них: иначе файл отзывов или комментариев сослался бы на отсутствующие
+# в выгрузке произведения и пользователей.
+LIVE_ROWS = {
+    'users': {'pending_deletion': False},
+    'titles': {'pending_deletion': False},
+    'genre_title': {'title__pending_deletion': False},
+    'review': {
+        'title__pending_deletion': False,
+        'author__pending_deletion': False,
+    },
+    'comments': {
+        'review__title__pending_deletion': False,
+        'review__author__pending_deletion': False,
+        'author__pending_deletion': False,
+    },
+}
+CATALOGUE = ('category', 'genre', 'titles', 'genre_title')
+FEEDBACK = ('review', 'comments')
+FORMATS = ('csv', 'ndjson')
+
+
+def get_columns(dataset):
+    return [column for column, _ in DATASETS[dataset][1]]
+
+
+def export_rows(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки набора данных в порядке первичного ключа."""
+    model, columns = DATASETS[dataset]
+    return model.objects.filter(
+        **LIVE_ROWS.get(dataset, {})
+    ).order_by('pk').values_list(
+        *(field for _, field in columns)
+    ).iterator(chunk_size=chunk_size)
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def render_csv(dataset, rows):
+    """Строки CSV с заголовком, по одной."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(get_columns(dataset))
+    for row in rows:
+        writer.writerow(format_value(value) for value in row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def render_ndjson(dataset, rows):
+    """JSON-объекты с ключами-колонками, по одному на строку."""
+    columns = get_columns(dataset)
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+RENDERERS = {'csv': render_csv, 'ndjson': render_ndjson}
+
+
+def export(dataset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Набор данных в заданном формате как поток строк."""
+    return RENDERERS[export_format](dataset, export_rows(dataset, chunk_size))
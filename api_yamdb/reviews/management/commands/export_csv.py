@@ -0,0 +1,72 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import (
+    CATALOGUE, DATASETS, DEFAULT_CHUNK_SIZE, FEEDBACK, FORMATS, export
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгрузка каталога в файлы того же формата, что читает load_csv'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='Каталог для файлов выгрузки или "-" для вывода одного '
+                 'набора данных в stdout.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='Формат файлов.',
+        )
+        parser.add_argument(
+            '--datasets',
+            nargs='+',
+            choices=tuple(DATASETS),
+            default=CATALOGUE,
+            help='Наборы данных; по умолчанию - каталог произведений.',
+        )
+        parser.add_argument(
+            '--with-reviews',
+            action='store_true',
+            help='Добавить к выгрузке отзывы и комментарии.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        datasets = list(options['datasets'])
+        if options['with_reviews']:
+            datasets += [name for name in FEEDBACK if name not in datasets]
+        export_format = options['format']
+
+        if options['output'] == '-':
+            if len(datasets) != 1:
+                raise CommandError(
+                    'В stdout выгружается только один набор данных.'
+                )
+            for chunk in export(datasets[0], export_format,
+                                options['chunk_size']):
+                self.stdout.write(chunk, ending='')
+            return
+
+        os.makedirs(options['output'], exist_ok=True)
+        for dataset in datasets:
+            path = os.path.join(
+                options['output'], f'{dataset}.{export_format}'
+            )
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(
+                    export(dataset, export_format, options['chunk_size'])
+                )
+            self.stdout.write(f'{dataset}: {path}')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена.'))
@@ -1,11 +1,28 @@
 import csv
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from graphlib import TopologicalSorter
+from itertools import islice
+from multiprocessing import Manager
 
+import django
+from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from reviews.deletion import delete_rows
 from reviews.models import (
     Category, Comment, Genre, GenreTitle, Review, Title, User
 )
+from reviews.search import get_search_backend
+from reviews.signals import rows_loaded
 
 CSV_FILES = [
     ('users.csv', User),
@@ -22,27 +39,482 @@ HEADER_REPLACER = {
     'author': 'author_id',
 }
 
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = min(os.cpu_count() or 1, len(CSV_FILES))
+QUEUE_DEPTH = 4
+# Родители, ответы которых устаревают при изменении записи (см. rows_loaded).
+PARENT_FIELDS = {
+    Review: 'title_id',
+    Comment: 'review_id',
+    GenreTitle: 'title_id',
+}
+
+CHECKPOINT_FILENAME = '.load_csv_checkpoint.json'
+PROGRESS_INTERVAL = 1.0
+
+
+def load_order(csv_files):
+    """
+    Порядок загрузки файлов, построенный по внешним ключам моделей:
+     файл загружается только после файлов моделей, на которые он ссылается.
+    """
+    files = dict(csv_files)
+    filenames = {model: filename for filename, model in csv_files}
+    graph = TopologicalSorter()
+    for filename, model in csv_files:
+        graph.add(filename, *(
+            filenames[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in filenames
+        ))
+    return [(filename, files[filename]) for filename in graph.static_order()]
+
+
+def read_rows(path):
+    """Построчно читает CSV-файл, приводя заголовки к именам полей модели."""
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [
+            HEADER_REPLACER.get(column_name, column_name)
+            for column_name in reader.fieldnames
+        ]
+        yield from reader
+
+
+def batched(rows, size):
+    """Разбивает поток строк на пачки не длиннее size."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def clean_value(field, value):
+    if value == '' and field.null:
+        return None
+    return field.to_python(value)
+
+
+def parse_rows(path, model, skip=0):
+    """
+    Читает строки файла начиная с skip и приводит значения к типам полей
+     модели, чтобы ошибки данных находились до записи в базу.
+    """
+    fields = None
+    for number, row in enumerate(islice(read_rows(path), skip, None), skip):
+        try:
+            if fields is None:
+                fields = {name: model._meta.get_field(name) for name in row}
+            yield {
+                name: clean_value(fields[name], value)
+                for name, value in row.items()
+            }
+        except FieldDoesNotExist as error:
+            raise CommandError(f'{path}: {error}')
+        except ValidationError as error:
+            raise CommandError(
+                f'{path}, строка {number + 1}: {"; ".join(error.messages)}'
+            )
+
+
+@contextmanager
+def source_dates(model, columns):
+    """
+    Отключает auto_now_add у полей модели, значения которых есть в файле:
+     иначе bulk_create заменил бы даты публикации из файла текущим временем.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in columns
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def init_worker():
+    django.setup()
+
+
+def parse_file(path, model_label, skip, batch_size, queue):
+    """
+    Задача рабочего процесса: разбирает файл и передаёт пачки проверенных
+     строк в очередь. Конец файла обозначается None, ошибка - передачей
+     самого исключения.
+    """
+    try:
+        model = apps.get_model(model_label)
+        for batch in batched(parse_rows(path, model, skip), batch_size):
+            queue.put(batch)
+    except Exception as error:
+        queue.put(CommandError(str(error)))
+    else:
+        queue.put(None)
+
+
+class Checkpoint:
+    """
+    Журнал загрузки: какие файлы загружены полностью и сколько строк
+     текущего файла уже зафиксировано в базе.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = []
+        self.current = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise CommandError(
+                f'Не найден журнал загрузки {self.path}, продолжать нечего.'
+            )
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        self.completed = state['completed']
+        self.current = state['current']
+
+    def is_completed(self, filename):
+        return filename in self.completed
+
+    def committed_rows(self, filename):
+        return self.current.get(filename, 0)
+
+    def commit(self, filename, rows):
+        self.current = {filename: rows}
+        self.save()
+
+    def complete(self, filename):
+        self.completed.append(filename)
+        self.current = {}
+        self.save()
+
+    def save(self):
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'completed': self.completed, 'current': self.current}, f
+            )
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
 
 class Command(BaseCommand):
     help = 'Загрузка CSV файлов в базу данных'
 
-    def handle(self, *args, **options):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, записываемых в одной транзакции.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванную загрузку с последней '
+                 'зафиксированной пачки.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=settings.CSV_PATH + CHECKPOINT_FILENAME,
+            help='Путь к журналу загрузки.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Количество процессов для разбора файлов; 0 - разбирать '
+                 'в основном процессе.',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Не очищать базу, а добавить новые, обновить изменённые '
+                 'и удалить отсутствующие в файлах записи.',
+        )
+        parser.add_argument(
+            '--delete-missing-users',
+            action='store_true',
+            help='При инкрементальной загрузке удалять и пользователей, '
+                 'которых нет в users.csv. Без ключа пользователи, '
+                 'зарегистрированные через API, и администраторы '
+                 'сохраняются.',
+        )
 
-        self.stdout.write(self.style.NOTICE('Идет подготовка...'))
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.incremental = options['incremental']
+        self.delete_missing_users = options['delete_missing_users']
+        # Ключи и родители изменённых записей; при продолжении загрузки
+        # изменения прерванного запуска неизвестны, и всё строится заново.
+        self.changed = None
+        if self.incremental and not options['resume']:
+            self.changed = defaultdict(lambda: (set(), set()))
+        if self.batch_size < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        csv_files = load_order(CSV_FILES)
+        checkpoint = Checkpoint(options['checkpoint'])
 
-        for _, model in reversed(CSV_FILES):
-            model.objects.all().delete()
+        if options['resume']:
+            checkpoint.load()
+            self.stdout.write(self.style.NOTICE('Продолжаю загрузку...'))
+        elif self.incremental:
+            checkpoint.save()
+        else:
+            self.stdout.write(self.style.NOTICE('Идет подготовка...'))
+            cleared = set()
+            for _, model in reversed(csv_files):
+                self.clear(model, cleared)
+                cleared.add(model)
+            checkpoint.save()
 
         self.stdout.write(self.style.NOTICE('Загружаю данные...'))
 
-        for filename, model in CSV_FILES:
-            with open(settings.CSV_PATH + filename, encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for index, column_name in enumerate(reader.fieldnames):
-                    if column_name in HEADER_REPLACER:
-                        reader.fieldnames[index] = HEADER_REPLACER[column_name]
-                model.objects.bulk_create(
-                    model(**row) for row in reader
-                )
+        pending = []
+        for filename, model in csv_files:
+            if checkpoint.is_completed(filename):
+                self.stdout.write(f'{filename}: уже загружен, пропускаю')
+            else:
+                pending.append((filename, model))
+
+        if options['workers'] > 0:
+            self.load_parallel(pending, checkpoint, options['workers'])
+        else:
+            self.load_sequential(pending, checkpoint)
+
+        if self.incremental:
+            self.delete_missing(csv_files)
+        checkpoint.clear()
+        self.refresh_derived()
 
         self.stdout.write(self.style.SUCCESS('Успешная загрузка!'))
+
+    def clear(self, model, cleared):
+        """
+        Очищает таблицу модели пачками по batch_size строк, каждую в своей
+         транзакции.
+
+        Если на таблицу ссылаются только уже очищенные модели, пачка
+         удаляется прямым DELETE: без загрузки записей и сигналов, которые
+         обновляли бы рейтинг произведения на каждый отзыв. Рейтинги и
+         поисковый индекс после загрузки всё равно строятся заново.
+        """
+        references = [
+            relation.related_model
+            for relation in model._meta.related_objects
+        ] + [field.remote_field.through for field in model._meta.many_to_many]
+        raw = all(reference in cleared for reference in references)
+        pks = model.objects.order_by('pk').values_list('pk', flat=True)
+        while batch := list(pks[:self.batch_size]):
+            with transaction.atomic():
+                if raw:
+                    delete_rows(model, 'pk', batch)
+                else:
+                    model.objects.filter(pk__in=batch).delete()
+
+    def load_sequential(self, pending, checkpoint):
+        """Разбирает и пишет файлы по очереди в основном процессе."""
+        for filename, model in pending:
+            rows = parse_rows(
+                settings.CSV_PATH + filename, model,
+                checkpoint.committed_rows(filename),
+            )
+            self.load_file(
+                filename, model, checkpoint, batched(rows, self.batch_size)
+            )
+
+    def load_parallel(self, pending, checkpoint, workers):
+        """
+        Разбирает файлы в рабочих процессах, а пишет в базу только основной
+         процесс, в порядке зависимостей.
+
+        Задачи ставятся в пул в том же порядке, в каком файлы пишутся, а
+         очереди ограничены по длине: пока основной процесс пишет один файл,
+         независимые от него файлы уже разбираются, но не накапливаются в
+         памяти целиком.
+        """
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool, \
+                Manager() as manager:
+            queues = {}
+            for filename, model in pending:
+                queues[filename] = manager.Queue(QUEUE_DEPTH)
+                pool.submit(
+                    parse_file,
+                    settings.CSV_PATH + filename,
+                    model._meta.label,
+                    checkpoint.committed_rows(filename),
+                    self.batch_size,
+                    queues[filename],
+                )
+            for filename, model in pending:
+                self.load_file(
+                    filename, model, checkpoint,
+                    self.receive_batches(queues[filename]),
+                )
+
+    @staticmethod
+    def receive_batches(queue):
+        while (batch := queue.get()) is not None:
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+
+    def load_file(self, filename, model, checkpoint, batches):
+        """
+        Записывает пачки строк файла, каждую в своей транзакции, отмечая в
+         журнале число зафиксированных строк.
+
+        При продолжении загрузки уже зафиксированные строки пропускаются,
+         а первая пачка пишется с ignore_conflicts: она могла попасть в базу
+         до того, как журнал успел обновиться.
+        """
+        loaded = checkpoint.committed_rows(filename)
+        may_conflict = loaded > 0
+        started = last_report = time.monotonic()
+        new_rows = created = updated = 0
+
+        for batch in batches:
+            with transaction.atomic(), source_dates(model, batch[0]):
+                if self.incremental:
+                    batch_created, batch_updated = self.upsert(model, batch)
+                else:
+                    model.objects.bulk_create(
+                        (model(**row) for row in batch),
+                        batch_size=self.batch_size,
+                        ignore_conflicts=may_conflict,
+                    )
+                    batch_created, batch_updated = len(batch), 0
+            may_conflict = False
+            loaded += len(batch)
+            new_rows += len(batch)
+            created += batch_created
+            updated += batch_updated
+            checkpoint.commit(filename, loaded)
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                self.report_progress(filename, loaded, new_rows, started)
+
+        checkpoint.complete(filename)
+        self.report_progress(filename, loaded, new_rows, started)
+        if self.incremental:
+            self.stdout.write(
+                f'{filename}: добавлено {created}, обновлено {updated}'
+            )
+
+    def upsert(self, model, batch):
+        """
+        Сверяет пачку строк с записями базы по первичному ключу: новые
+         строки добавляются, изменённые обновляются, совпадающие с базой
+         пропускаются.
+        """
+        pk_name = model._meta.pk.attname
+        columns = list(batch[0])
+        if pk_name not in columns:
+            raise CommandError(
+                f'Для инкрементальной загрузки {model._meta.label} в файле '
+                f'нужна колонка {pk_name}.'
+            )
+        existing = {
+            row[pk_name]: row
+            for row in model.objects.filter(
+                pk__in=[row[pk_name] for row in batch]
+            ).order_by().values(*columns)
+        }
+        to_create = [
+            model(**row) for row in batch if row[pk_name] not in existing
+        ]
+        to_update = [
+            model(**row) for row in batch
+            if row[pk_name] in existing and existing[row[pk_name]] != row
+        ]
+        if self.changed is not None:
+            pks, parents = self.changed[model]
+            parent_field = PARENT_FIELDS.get(model)
+            for instance in to_create + to_update:
+                pks.add(instance.pk)
+                if parent_field is not None:
+                    parents.add(getattr(instance, parent_field))
+                    previous = existing.get(instance.pk)
+                    if previous is not None:
+                        parents.add(previous[parent_field])
+        model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            model.objects.bulk_update(
+                to_update,
+                [column for column in columns if column != pk_name],
+                batch_size=self.batch_size,
+            )
+        return len(to_create), len(to_update)
+
+    def delete_missing(self, csv_files):
+        """
+        Удаляет записи, первичных ключей которых больше нет в файлах.
+
+        Идёт в обратном порядке зависимостей, чтобы зависимые записи
+         удалялись раньше тех, на которые они ссылаются.
+        """
+        for filename, model in reversed(csv_files):
+            if model is User and not self.delete_missing_users:
+                continue
+            pk_field = model._meta.pk
+            incoming = {
+                pk_field.to_python(row[pk_field.attname])
+                for row in read_rows(settings.CSV_PATH + filename)
+            }
+            stale = [
+                pk for pk in model.objects.order_by().values_list(
+                    'pk', flat=True
+                ).iterator()
+                if pk not in incoming
+            ]
+            for batch in batched(stale, self.batch_size):
+                with transaction.atomic():
+                    model.objects.filter(pk__in=batch).delete()
+            if stale:
+                self.stdout.write(f'{filename}: удалено {len(stale)}')
+
+    def refresh_derived(self):
+        """
+        bulk_create не вызывает сигналы, поэтому рейтинги и поисковый
+         индекс обновляются здесь: после инкрементальной загрузки - только
+         для изменённых записей, иначе строятся заново.
+        """
+        if self.changed is None:
+            call_command('rebuild_ratings', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+        else:
+            self.refresh_changed()
+
+    def refresh_changed(self):
+        """
+        Пересчитывает рейтинги произведений, отзывы которых изменились,
+         обновляет в поисковом индексе изменённые произведения и сообщает
+         об изменённых записях сигналом rows_loaded (сброс кэша ответов).
+
+        Удалённые записи сюда не попадают: их удаляет ORM, и рейтинги,
+         индекс и кэш обновляют сигналы моделей.
+        """
+        title_ids = self.changed[Title][0] | self.changed[Review][1]
+        for batch in batched(sorted(title_ids), self.batch_size):
+            Title.objects.filter(pk__in=batch).rebuild_ratings()
+        for batch in batched(sorted(self.changed[Title][0]), self.batch_size):
+            get_search_backend().index(Title.objects.filter(pk__in=batch))
+        for model, (pks, parents) in self.changed.items():
+            if pks:
+                rows_loaded.send(sender=model, pks=pks, parents=parents)
+        if title_ids:
+            self.stdout.write(
+                f'Пересчитаны рейтинги произведений: {len(title_ids)}'
+            )
+
+    def report_progress(self, filename, loaded, new_rows, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(
+            f'{filename}: {loaded} строк, {new_rows / elapsed:.0f} строк/с'
+        )
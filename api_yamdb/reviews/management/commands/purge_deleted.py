@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.deletion import purge_pending
+
+
+class Command(BaseCommand):
+    help = 'Удаление помеченных к удалению произведений и пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.DEFERRED_DELETION['BATCH_SIZE'],
+            help='Количество зависимых записей, удаляемых в одной '
+                 'транзакции.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.DEFERRED_DELETION['POLL_INTERVAL'],
+            help='Пауза в секундах между проверками помеченных записей.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Удалить помеченные записи один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        if options['once']:
+            self.purge(options['batch_size'])
+            return
+        self.stdout.write(self.style.NOTICE(
+            'Обработчик удаления запущен, Ctrl+C для остановки.'
+        ))
+        try:
+            while True:
+                self.purge(options['batch_size'])
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE('Обработчик остановлен.'))
+
+    def purge(self, batch_size):
+        titles, users = purge_pending(batch_size)
+        if titles or users:
+            self.stdout.write(
+                f'Удалено произведений: {titles}, пользователей: {users}'
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+from reviews.signals import catalogue_rebuilt
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчёт хранимых рейтингов и гистограмм оценок произведений за '
+        'один проход по таблице отзывов'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Пересчитываю рейтинги...'))
+        updated = Title.objects.rebuild_ratings()
+        catalogue_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено произведений: {updated}')
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import get_search_backend
+from reviews.signals import catalogue_rebuilt
+
+
+class Command(BaseCommand):
+    help = 'Перестроение полнотекстового индекса произведений'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.NOTICE('Перестраиваю поисковый индекс...')
+        )
+        indexed = get_search_backend().rebuild()
+        catalogue_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано произведений: {indexed}')
+        )
@@ -1,9 +1,27 @@
+import operator
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 User = get_user_model()
 
+# Допустимые оценки отзыва; для каждой произведение хранит счётчик отзывов.
+SCORES = range(1, 11)
+
+
+def histogram_field(score):
+    """Имя поля Title со счётчиком отзывов с оценкой score."""
+    return f'score_{score}_count'
+
+
+HISTOGRAM_FIELDS = tuple(histogram_field(score) for score in SCORES)
+
 
 class Category(models.Model):
     """Модель 'Категории'.
@@ -58,6 +76,139 @@ class Genre(models.Model):
         return self.name
 
 
+def default_weighted_rating():
+    """Взвешенный рейтинг произведения без отзывов - средняя оценка prior."""
+    prior = settings.TITLE_RATING_PRIOR
+    return float(prior['MEAN']) if prior['WEIGHT'] else None
+
+
+class TitleQuerySet(models.QuerySet):
+    """Обновление хранимых агрегатов рейтинга произведений."""
+
+    def change_rating(self, score, delta):
+        """
+        Добавляет (delta=1) или убирает (delta=-1) одну оценку score:
+         сдвигает сумму, количество и счётчик гистограммы и пересчитывает
+         рейтинги одним атомарным UPDATE.
+        """
+        field = histogram_field(score)
+        return self.set_rating(
+            F('rating_sum') + score * delta,
+            F('rating_count') + delta,
+            **{field: F(field) + delta},
+        )
+
+    def add_scores(self, scores):
+        """
+        Добавляет к агрегатам рейтинга все оценки scores одним атомарным
+         UPDATE, не перечитывая таблицу отзывов.
+        """
+        counts = Counter(int(score) for score in scores)
+        return self.set_rating(
+            F('rating_sum') + sum(map(operator.mul, counts, counts.values())),
+            F('rating_count') + sum(counts.values()),
+            **{
+                histogram_field(score): F(histogram_field(score)) + count
+                for score, count in counts.items()
+            },
+        )
+
+    def recalculate_ratings(self):
+        """
+        Полностью пересчитывает агрегаты рейтинга и гистограммы оценок по
+         таблице отзывов одним UPDATE с подзапросами для каждого
+         произведения. Подходит для небольших выборок произведений; все
+         произведения быстрее пересчитывает rebuild_ratings.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+
+        def total(aggregate, **filters):
+            return Coalesce(
+                Subquery(
+                    reviews.filter(**filters).annotate(
+                        total=aggregate
+                    ).values('total')
+                ),
+                0,
+                output_field=models.PositiveIntegerField(),
+            )
+
+        return self.set_rating(
+            total(Sum('score')),
+            total(Count('id')),
+            **{
+                histogram_field(score): total(Count('id'), score=score)
+                for score in SCORES
+            },
+        )
+
+    def rebuild_ratings(self, batch_size=1000):
+        """
+        Пересчитывает агрегаты рейтинга и гистограммы оценок выбранных
+         произведений за один проход по таблице отзывов и возвращает число
+         обновлённых произведений.
+
+        Отзывы группируются по произведению одним запросом, счётчики
+         записываются пачками подготовленного UPDATE (bulk_update строит
+         CASE по каждому полю и на тысячах строк в разы медленнее), а
+         рейтинги затем вычисляются по записанным счётчикам одним UPDATE.
+        """
+        histograms = Review.objects.filter(
+            title__in=self.values('pk')
+        ).order_by('title').values('title').annotate(**{
+            histogram_field(score): Count('id', filter=Q(score=score))
+            for score in SCORES
+        }).iterator()
+        fields = ('rating_sum', 'rating_count', *HISTOGRAM_FIELDS)
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+            quote(meta.db_table),
+            ', '.join(
+                f'{quote(meta.get_field(field).column)} = %s'
+                for field in fields
+            ),
+            quote(meta.pk.column),
+        )
+        with transaction.atomic(using=self.db):
+            self.update(**dict.fromkeys(fields, 0))
+            while batch := list(islice(histograms, batch_size)):
+                params = []
+                for row in batch:
+                    counts = [row[field] for field in HISTOGRAM_FIELDS]
+                    params.append((
+                        sum(map(operator.mul, SCORES, counts)),
+                        sum(counts),
+                        *counts,
+                        row['title'],
+                    ))
+                with connection.cursor() as cursor:
+                    cursor.executemany(sql, params)
+            return self.set_rating(F('rating_sum'), F('rating_count'))
+
+    def set_rating(self, rating_sum, rating_count, **histogram):
+        """
+        Записывает сумму и количество оценок, счётчики гистограммы и
+         вычисляемые по ним средний и взвешенный рейтинги
+         (TITLE_RATING_PRIOR).
+        """
+        prior = settings.TITLE_RATING_PRIOR
+        score_sum = Cast(rating_sum, models.FloatField())
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=score_sum / NullIf(rating_count, 0),
+            weighted_rating=(
+                (score_sum + float(prior['MEAN']) * prior['WEIGHT'])
+                / NullIf(rating_count + prior['WEIGHT'], 0)
+            ),
+            **histogram,
+        )
+
+
 class Title(models.Model):
     """Модель 'Произведение'.
 
@@ -68,6 +219,20 @@ class Title(models.Model):
      Необязательное для заполнения. -> int
     genre -- ссылка на объект жанра. -> str(genre__slug)
     category -- ссылка на объект категории произведения. -> str(category_slug)
+    rating_sum -- сумма оценок всех отзывов на произведение. -> int
+    rating_count -- количество отзывов на произведение. -> int
+    rating -- средняя оценка произведения, None при отсутствии
+     отзывов. -> float
+    weighted_rating -- байесовский рейтинг: средняя оценка, сглаженная к
+     TITLE_RATING_PRIOR, чтобы произведения с парой отзывов не обгоняли
+     произведения с сотнями. -> float
+    score_1_count ... score_10_count -- гистограмма оценок: число отзывов
+     с каждой оценкой (см. HISTOGRAM_FIELDS). -> int
+    pending_deletion -- произведение удалено через API и ждёт, пока
+     обработчик удалит его отзывы и связи (см. reviews.deletion). -> bool
+
+    Агрегаты рейтинга хранятся в таблице и поддерживаются сигналами
+     модели Review (см. reviews.signals).
     """
 
     name = models.CharField(
@@ -83,7 +248,8 @@ class Title(models.Model):
         verbose_name='Год выпуска произведения',
         blank=True,
         null=True,
-        db_index=True,
+        # Покрыт составным индексом title_year_idx.
+        db_index=False,
     )
     genre = models.ManyToManyField(
         Genre,
@@ -97,15 +263,75 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория произведения',
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False,
+    )
+    weighted_rating = models.FloatField(
+        verbose_name='Взвешенный рейтинг',
+        null=True,
+        default=default_weighted_rating,
+        editable=False,
+    )
+    pending_deletion = models.BooleanField(
+        verbose_name='Ожидает удаления',
+        default=False,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        # Индексы сортировок списка произведений: id в конце делает порядок
+        # однозначным (см. api.filters.TitleOrderingFilter).
+        indexes = [
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('weighted_rating', 'id'),
+                name='title_weighted_rating_idx',
+            ),
+            models.Index(
+                fields=('rating_count', 'id'), name='title_rating_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_histogram(self):
+        """Гистограмма оценок: {оценка: число отзывов}."""
+        return {
+            score: getattr(self, histogram_field(score)) for score in SCORES
+        }
+
+
+# Счётчики гистограммы - отдельные колонки: так отзыв меняет ровно одну из
+# них атомарным UPDATE, а произведение остаётся одной строкой.
+for score in SCORES:
+    Title.add_to_class(histogram_field(score), models.PositiveIntegerField(
+        verbose_name=f'Отзывов с оценкой {score}',
+        default=0,
+        editable=False,
+    ))
+del score
+
 
 class GenreTitle(models.Model):
     """Вспомогательная модель для описания связи Title-Genre."""
@@ -142,20 +368,24 @@ class Review(models.Model):
     pub_date -- поле для хранения даты публикации отзыва.
     """
 
-    MIN_SCORE_VALUE = 1
-    MAX_SCORE_VALUE = 10
+    MIN_SCORE_VALUE = SCORES[0]
+    MAX_SCORE_VALUE = SCORES[-1]
 
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='reviews',
         verbose_name='Пользователь',
+        # Покрыт индексом ограничения unique_review (author, title).
+        db_index=False,
     )
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
         verbose_name='Произведение',
+        # Покрыт составным индексом review_title_pub_date_idx.
+        db_index=False,
     )
     text = models.TextField(verbose_name='Текст отзыва', )
     score = models.PositiveSmallIntegerField(
@@ -168,7 +398,13 @@ class Review(models.Model):
     pub_date = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -180,6 +416,11 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется сигналами в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментариев.
@@ -205,6 +446,8 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments',
         verbose_name='Отзыв',
+        # Покрыт составным индексом comment_review_pub_date_idx.
+        db_index=False,
     )
     pub_date = models.DateTimeField(auto_now_add=True)
     text = models.TextField(verbose_name='Текст комментария')
@@ -212,7 +455,13 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
-        return self.author
+        return self.text
@@ -0,0 +1,143 @@
+"""
+Полнотекстовый поиск произведений.
+
+Бэкенд выбирается настройкой TITLE_SEARCH_BACKEND - путём к классу,
+ реализующему интерфейс BaseTitleSearchBackend. Индекс обновляется
+ сигналами модели Title и перестраивается командой rebuild_search_index.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from reviews.models import Title
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def split_words(query):
+    return WORD_PATTERN.findall(query.lower())
+
+
+class BaseTitleSearchBackend:
+    """Интерфейс бэкенда полнотекстового поиска произведений."""
+
+    def index(self, titles):
+        """Добавляет или обновляет произведения в индексе."""
+        raise NotImplementedError
+
+    def remove(self, title_ids):
+        """Удаляет произведения из индекса."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Перестраивает индекс по таблице произведений."""
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        """
+        Оставляет в queryset произведения, подходящие под запрос, и
+         упорядочивает их по релевантности.
+        """
+        raise NotImplementedError
+
+
+class SimpleTitleSearchBackend(BaseTitleSearchBackend):
+    """
+    Поиск без индекса: каждое слово запроса должно встречаться в названии
+     или описании. Подходит для СУБД без полнотекстового поиска.
+    """
+
+    def index(self, titles):
+        pass
+
+    def remove(self, title_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def search(self, queryset, query):
+        words = split_words(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+
+
+class SQLiteFTSTitleSearchBackend(BaseTitleSearchBackend):
+    """
+    Поиск по виртуальной таблице SQLite FTS5, rowid которой совпадает с id
+     произведения. Релевантность считается функцией bm25, совпадение в
+     названии весит больше совпадения в описании.
+    """
+
+    table = 'reviews_title_fts'
+    name_weight = 10.0
+    description_weight = 1.0
+
+    def index(self, titles):
+        rows = [(title.pk, title.name, title.description) for title in titles]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, name, description) '
+                'VALUES (%s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, title_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(title_id,) for title_id in title_ids],
+            )
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, description) '
+                f'SELECT id, name, description FROM {Title._meta.db_table}'
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def match_expression(query):
+        """Каждое слово запроса ищется как префикс, все слова обязательны."""
+        return ' '.join(f'"{word}"*' for word in split_words(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        title_table = Title._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+                (match,),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({self.table}, {self.name_weight}, '
+                f'{self.description_weight}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s '
+                f'AND rowid = "{title_table}"."id"',
+                (match,),
+            )
+        ).order_by('search_rank', 'name')
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    return import_string(settings.TITLE_SEARCH_BACKEND)()
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from reviews.models import Review, Title
+from reviews.search import get_search_backend
+
+# Отправляется после массовых изменений каталога в обход сигналов моделей
+# (загрузка CSV, пересчёт агрегатов и индексов).
+catalogue_rebuilt = Signal()
+
+# Отправляется после удаления пачки записей в обход сигналов моделей
+# (reviews.deletion): sender - модель, pks - ключи удалённых записей,
+# parents - ключи их родителей (произведений для отзывов и связей с
+# жанрами, отзывов для комментариев).
+rows_purged = Signal()
+
+# Отправляется после добавления или изменения пачки записей в обход
+# сигналов моделей (инкрементальная загрузка CSV); аргументы те же, что у
+# rows_purged, parents включают и прежних родителей изменённых записей.
+rows_loaded = Signal()
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    """Запоминает прежние произведение и оценку редактируемого отзыва."""
+    instance._previous_score = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_score = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    current = (instance.title_id, int(instance.score))
+    previous = getattr(instance, '_previous_score', None)
+    if previous == current:
+        return
+    if previous is not None:
+        title_id, score = previous
+        Title.objects.filter(pk=title_id).change_rating(score, -1)
+    title_id, score = current
+    Title.objects.filter(pk=title_id).change_rating(score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удалённого отзыва из рейтинга произведения."""
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        int(instance.score), -1
+    )
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw, **kwargs):
+    """Обновляет произведение в поисковом индексе."""
+    if not raw:
+        get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    get_search_backend().remove([instance.pk])
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from users.models import CustomUser
+from users.models import CustomUser, OutgoingEmail
 
 UserAdmin.fieldsets += (
     ('Роль', {'fields': ('role',)}),
@@ -9,3 +9,13 @@ UserAdmin.fieldsets += (
 )
 
 admin.site.register(CustomUser, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'created', 'attempts', 'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
+    readonly_fields = ('created',)
+    # Текст письма содержит код подтверждения.
+    exclude = ('message',)
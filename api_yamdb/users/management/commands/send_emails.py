@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX['BATCH_SIZE'],
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EMAIL_OUTBOX['POLL_INTERVAL'],
+            help='Пауза в секундах между проверками пустой очереди.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        if options['once']:
+            self.deliver(options['batch_size'])
+            return
+        self.stdout.write(self.style.NOTICE(
+            'Обработчик очереди писем запущен, Ctrl+C для остановки.'
+        ))
+        try:
+            while True:
+                self.deliver(options['batch_size'])
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE('Обработчик остановлен.'))
+
+    def deliver(self, batch_size):
+        sent, failed = deliver_pending(batch_size)
+        if sent or failed:
+            self.stdout.write(f'Отправлено: {sent}, с ошибкой: {failed}')
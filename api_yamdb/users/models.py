@@ -13,6 +13,9 @@ class CustomUser(AbstractUser):
      Необязательное значение. -> str
     role -- символьное поле для хранения ролей пользователя.
      Значение по умалчанию == 'user'. -> str
+    pending_deletion -- пользователь удалён через API и ждёт, пока
+     обработчик удалит его отзывы и комментарии (см. reviews.deletion).
+     -> bool
     """
 
     SIMPLE_USER = 'user'
@@ -42,6 +45,11 @@ class CustomUser(AbstractUser):
         choices=ROLES,
         default='user'
     )
+    pending_deletion = models.BooleanField(
+        verbose_name='Ожидает удаления',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -61,3 +69,44 @@ class CustomUser(AbstractUser):
 
     def __str__(self) -> str:
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Атрибуты:
+    subject, message, from_email, recipient -- содержимое письма.
+    created -- время постановки в очередь.
+    send_after -- раньше этого времени письмо не отправляется: так
+     откладываются повторные попытки и письма, взятые другим обработчиком.
+    attempts -- число неудачных попыток отправки.
+    last_error -- текст последней ошибки отправки.
+    sent_at -- время успешной отправки; None, пока письмо в очереди.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('send_after', 'id')
+        indexes = [
+            # Обработчик выбирает только неотправленные письма, поэтому
+            # индекс частичный и не растёт вместе с архивом отправленных.
+            models.Index(
+                fields=('send_after', 'id'),
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {self.recipient}'
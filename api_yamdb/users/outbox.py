@@ -0,0 +1,130 @@
+"""
+Очередь исходящих писем.
+
+Письма сохраняются в таблицу OutgoingEmail в той же транзакции, что и
+ вызвавшие их изменения, а отправляет их обработчик
+ `python manage.py send_emails`: пачками, через одно соединение с почтовым
+ сервером и с повторными попытками при ошибках. Так запрос не ждёт почтовый
+ сервер, а письмо не теряется, если сервер временно недоступен.
+
+Текст письма содержит код подтверждения, поэтому после отправки (или
+ последней неудачной попытки) он стирается, а в очереди остаются только
+ тема, адреса и время.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def enqueue_email(subject, message, from_email, recipient):
+    """
+    Ставит письмо в очередь. При EMAIL_OUTBOX['EAGER'] очередь разбирается
+     сразу после фиксации транзакции, в текущем процессе.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient,
+        send_after=timezone.now(),
+    )
+    if settings.EMAIL_OUTBOX['EAGER']:
+        transaction.on_commit(deliver_pending)
+    return email
+
+
+def claim_batch(batch_size):
+    """
+    Забирает пачку писем, которые пора отправить, отодвигая их send_after
+     на время аренды: параллельно запущенный обработчик их уже не выберет.
+    """
+    options = settings.EMAIL_OUTBOX
+    now = timezone.now()
+    pending = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=now,
+        attempts__lt=options['MAX_ATTEMPTS'],
+    )
+    ids = list(pending.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    leased_until = now + timedelta(seconds=options['LEASE'])
+    pending.filter(pk__in=ids).update(send_after=leased_until)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=ids, sent_at__isnull=True, send_after=leased_until
+    ))
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX['RETRY_DELAY'] * 2 ** (attempts - 1)
+    )
+
+
+def deliver_batch(batch_size=None):
+    """
+    Отправляет одну пачку писем через одно соединение и возвращает пару
+     (отправлено, не отправлено). Неотправленные письма остаются в очереди
+     до следующей попытки.
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX['BATCH_SIZE'])
+    if not emails:
+        return 0, 0
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        failed = emails
+        for email in failed:
+            mark_failed(email, error)
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=(email.recipient,),
+                        connection=connection,
+                    )])
+                except Exception as error:
+                    mark_failed(email, error)
+                    failed.append(email)
+                else:
+                    email.sent_at = timezone.now()
+                    email.message = ''
+                    sent.append(email)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(sent, ('sent_at', 'message'))
+    OutgoingEmail.objects.bulk_update(
+        failed, ('attempts', 'last_error', 'send_after', 'message')
+    )
+    return len(sent), len(failed)
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.send_after = timezone.now() + retry_delay(email.attempts)
+    if email.attempts >= settings.EMAIL_OUTBOX['MAX_ATTEMPTS']:
+        email.message = ''
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет пачки, пока в очереди есть письма, которые пора отправить."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
@@ -0,0 +1,82 @@
+"""
+Бенчмарк страниц списков панели администратора: отзывы, комментарии и
+произведения по 100 строк на странице, поиск и дальняя страница.
+
+Отчёт совместим с compare.py, поэтому запуск до и после изменения
+admin.py можно сравнить.
+
+Пример:
+    python benchmarks/bench_admin.py --reviews 1000000 --comments 5000000
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    add_size_arguments, database_path, measure, seed_database, setup_django,
+    write_report,
+)
+
+
+def build_scenarios(options):
+    """Сценарии бенчмарка: имя -> вызов, открывающий одну страницу."""
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from reviews.admin import ReviewAdmin
+
+    User = get_user_model()
+    User.objects.filter(pk=1).update(is_staff=True, is_superuser=True)
+    client = Client()
+    client.force_login(User.objects.get(pk=1))
+
+    def page(url, **params):
+        return lambda: client.get(url, params)
+
+    # Средняя страница списка отзывов; номера страниц админки с нуля.
+    deep_page = options.reviews // ReviewAdmin.list_per_page // 2
+
+    return {
+        'reviews': page('/admin/reviews/review/'),
+        'reviews_deep_page': page('/admin/reviews/review/', p=deep_page),
+        'reviews_search': page('/admin/reviews/review/', q='user2'),
+        'comments': page('/admin/reviews/comment/'),
+        'comments_search': page('/admin/reviews/comment/', q='user2'),
+        'titles': page('/admin/reviews/title/'),
+        'titles_search': page('/admin/reviews/title/', q='Произведение 7'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_size_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--output', default='bench_admin.json')
+    options = parser.parse_args()
+
+    setup_django(database_path(options))
+    seed_database(options)
+
+    results = {}
+    for name, call in build_scenarios(options).items():
+        results[name] = measure(call, options.iterations)
+        if results[name]['status'] != 200:
+            sys.exit(
+                f'{name}: ответ со статусом {results[name]["status"]}, '
+                'а не 200 - замер недействителен.'
+            )
+        print(
+            '{:<20} status {status}  p50 {p50_ms:>9.3f} ms  '
+            'p95 {p95_ms:>9.3f} ms  queries {queries:>3}'.format(
+                name, **results[name]
+            )
+        )
+
+    write_report(options.output, options, results)
+    print(f'Отчёт сохранён в {options.output}')
+
+
+if __name__ == '__main__':
+    main()
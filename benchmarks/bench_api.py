@@ -0,0 +1,120 @@
+"""
+Бенчмарк эндпоинтов /api/v1: задержка p50/p95, число SQL-запросов
+и пик выделенной памяти на запрос.
+
+Пример:
+    python benchmarks/bench_api.py --titles 100000 --reviews 1000000 \\
+        --comments 5000000 --output report.json
+"""
+import argparse
+import itertools
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    add_size_arguments, database_path, measure, seed_database, setup_django,
+    write_report,
+)
+
+
+def build_scenarios(options):
+    """Сценарии бенчмарка: имя -> вызов, выполняющий один запрос."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.tokens import default_token_generator
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import Review
+
+    User = get_user_model()
+    admin = User.objects.get(pk=1)
+    member = User.objects.get(pk=2)
+    anonymous = Client()
+    client = Client(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+    )
+
+    title_id = options.titles // 2 or 1
+    review = Review.objects.filter(title_id=title_id).first()
+    review_id = review.pk if review else 1
+    deep_page = max(1, options.titles // 10 // 2)
+    signups = itertools.count()
+    confirmation_code = default_token_generator.make_token(member)
+
+    def signup():
+        number = next(signups)
+        return anonymous.post('/api/v1/auth/signup/', data={
+            'username': f'bench{number}',
+            'email': f'bench{number}@yamdb.fake',
+        })
+
+    reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+    comments_url = f'{reviews_url}{review_id}/comments/'
+    return {
+        'titles_list': lambda: anonymous.get('/api/v1/titles/'),
+        'titles_list_deep_page': lambda: anonymous.get(
+            f'/api/v1/titles/?page={deep_page}'
+        ),
+        'titles_filter_genre': lambda: anonymous.get(
+            '/api/v1/titles/?genre=genre-1'
+        ),
+        'titles_search': lambda: anonymous.get(
+            '/api/v1/titles/?search=произведение 12'
+        ),
+        'titles_detail': lambda: anonymous.get(f'/api/v1/titles/{title_id}/'),
+        'reviews_list': lambda: anonymous.get(reviews_url),
+        'reviews_detail': lambda: anonymous.get(f'{reviews_url}{review_id}/'),
+        'comments_list': lambda: anonymous.get(comments_url),
+        'genres_list': lambda: anonymous.get('/api/v1/genres/'),
+        'categories_list': lambda: anonymous.get('/api/v1/categories/'),
+        'users_list': lambda: client.get('/api/v1/users/'),
+        'users_me': lambda: client.get('/api/v1/users/me/'),
+        'auth_signup': signup,
+        'auth_token': lambda: anonymous.post('/api/v1/auth/token/', data={
+            'username': member.username,
+            'confirmation_code': confirmation_code,
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_size_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument(
+        '--only', nargs='*', default=None,
+        help='Запустить только перечисленные сценарии.'
+    )
+    parser.add_argument('--output', default='bench_report.json')
+    parser.add_argument(
+        '--cache-backend', default='dummy',
+        help='Хранилище кэша ответов (API_CACHE_BACKEND); по умолчанию кэш '
+             'выключен, чтобы замерять обработку запроса.'
+    )
+    options = parser.parse_args()
+    os.environ['API_CACHE_BACKEND'] = options.cache_backend
+
+    setup_django(database_path(options))
+    seed_database(options)
+
+    results = {}
+    for name, call in build_scenarios(options).items():
+        if options.only and name not in options.only:
+            continue
+        results[name] = measure(call, options.iterations)
+        print(
+            '{:<24} p50 {p50_ms:>9.3f} ms  p95 {p95_ms:>9.3f} ms  '
+            'queries {queries:>3}  peak {peak_alloc_kib:>9.1f} KiB'.format(
+                name, **results[name]
+            )
+        )
+
+    write_report(options.output, options, results)
+    print(f'Отчёт сохранён в {options.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Бенчмарк сериализации для чтения: сериализаторы DRF против быстрых
+сериализаторов (api.fast) на страницах разного размера.
+
+Замеряется выборка страницы, сериализация и рендеринг JSON - всё, что
+делает list вьюсета, кроме маршрутизации и middleware.
+
+Пример:
+    python benchmarks/bench_serializers.py --titles 10000 \
+        --page-sizes 10 100 1000
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    add_size_arguments, database_path, measure, seed_database, setup_django,
+    write_report,
+)
+
+
+def build_scenarios(page_size):
+    """Сценарии: имя -> (путь DRF, быстрый путь) для одной страницы."""
+    from rest_framework.renderers import JSONRenderer
+
+    from api import serializers
+    from reviews.models import Comment, Review, Title
+
+    renderer = JSONRenderer()
+    title_id = Review.objects.values_list('title_id', flat=True).first()
+    review_id = Comment.objects.values_list('review_id', flat=True).first()
+    querysets = {
+        'titles': (
+            Title.objects.select_related('category').prefetch_related('genre'),
+            serializers.TitleReadSerializer,
+            serializers.TitleFastSerializer,
+        ),
+        'reviews': (
+            Review.objects.filter(title_id=title_id).select_related('author'),
+            serializers.ReviewSerializer,
+            serializers.ReviewFastSerializer,
+        ),
+        'comments': (
+            Comment.objects.filter(review_id=review_id)
+            .select_related('author'),
+            serializers.CommentSerializer,
+            serializers.CommentFastSerializer,
+        ),
+    }
+    scenarios = {}
+    for name, (queryset, drf, fast) in querysets.items():
+        scenarios[name] = (
+            lambda queryset=queryset, drf=drf: renderer.render(
+                drf(queryset[:page_size], many=True).data
+            ),
+            lambda queryset=queryset, fast=fast: renderer.render(
+                fast.serialize(fast.prepare(queryset)[:page_size])
+            ),
+        )
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_size_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=(10, 100, 1000)
+    )
+    parser.add_argument('--output', default='bench_serializers.json')
+    options = parser.parse_args()
+
+    setup_django(database_path(options))
+    seed_database(options)
+
+    results = {}
+    for page_size in options.page_sizes:
+        for name, (drf, fast) in build_scenarios(page_size).items():
+            assert drf() == fast(), f'{name}: вывод сериализаторов различается'
+            for variant, call in (('drf', drf), ('fast', fast)):
+                key = f'{name}_{page_size}_{variant}'
+                results[key] = measure(call, options.iterations)
+            speedup = (
+                results[f'{name}_{page_size}_drf']['p50_ms']
+                / max(results[f'{name}_{page_size}_fast']['p50_ms'], 1e-9)
+            )
+            print(
+                '{:<16} drf p50 {:>9.3f} ms  fast p50 {:>9.3f} ms  '
+                'x{:.1f}'.format(
+                    f'{name}/{page_size}',
+                    results[f'{name}_{page_size}_drf']['p50_ms'],
+                    results[f'{name}_{page_size}_fast']['p50_ms'],
+                    speedup,
+                )
+            )
+
+    write_report(options.output, options, results)
+    print(f'Отчёт сохранён в {options.output}')
+
+
+if __name__ == '__main__':
+    main()
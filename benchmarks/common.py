@@ -0,0 +1,237 @@
+"""
+Общая часть бенчмарков: настройка Django, генерация набора данных
+и измерение запросов.
+
+Набор данных детерминирован: при одинаковых размерах и зерне генератора
+база получается одинаковой, поэтому отчёты разных коммитов сравнимы.
+"""
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT_DIR / 'api_yamdb'
+
+SEED_BATCH_SIZE = 5000
+
+
+def setup_django(db_path):
+    """Подключает проект и настраивает Django на базу бенчмарка."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    sys.path.insert(0, str(ROOT_DIR))
+    os.environ['BENCH_DB'] = str(db_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+
+
+def add_size_arguments(parser):
+    """Аргументы командной строки, задающие размер набора данных."""
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=10000)
+    parser.add_argument('--comments', type=int, default=50000)
+    parser.add_argument('--genres', type=int, default=50)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--db-dir', default=str(ROOT_DIR / 'benchmarks'),
+        help='Каталог для файлов баз бенчмарка.'
+    )
+
+
+def database_path(options):
+    """База для каждого набора размеров своя и переиспользуется."""
+    name = 'bench-{}-{}-{}-{}-{}-{}.sqlite3'.format(
+        options.titles, options.reviews, options.comments,
+        options.genres, options.categories, options.seed,
+    )
+    Path(options.db_dir).mkdir(parents=True, exist_ok=True)
+    return Path(options.db_dir) / name
+
+
+def chunked(iterable, size=SEED_BATCH_SIZE):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def bulk_insert(model, objects):
+    for chunk in chunked(objects):
+        model.objects.bulk_create(chunk)
+
+
+def seed_database(options, stdout=sys.stdout):
+    """
+    Создаёт схему и заполняет базу, если это не было сделано ранее.
+
+    Каждому произведению достаётся равная доля отзывов от разных авторов,
+     поэтому ограничение уникальности (author, title) не нарушается.
+    """
+    from django.core.management import call_command
+    from django.contrib.auth import get_user_model
+
+    from reviews.models import (
+        Category, Comment, Genre, GenreTitle, Review, Title
+    )
+
+    User = get_user_model()
+    call_command('migrate', verbosity=0)
+    if Title.objects.exists():
+        return
+
+    rng = random.Random(options.seed)
+    users_count = max(100, options.reviews // max(options.titles, 1) + 1)
+    started = time.perf_counter()
+    stdout.write(f'Генерация данных: {users_count} пользователей, '
+                 f'{options.titles} произведений, {options.reviews} '
+                 f'отзывов, {options.comments} комментариев...\n')
+
+    bulk_insert(User, (
+        User(
+            id=index,
+            username=f'user{index}',
+            email=f'user{index}@yamdb.fake',
+            password='!',
+            role=User.ADMIN if index == 1 else User.SIMPLE_USER,
+        )
+        for index in range(1, users_count + 1)
+    ))
+    bulk_insert(Category, (
+        Category(id=index, name=f'Категория {index}', slug=f'category-{index}')
+        for index in range(1, options.categories + 1)
+    ))
+    bulk_insert(Genre, (
+        Genre(id=index, name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(1, options.genres + 1)
+    ))
+    bulk_insert(Title, (
+        Title(
+            id=index,
+            name=f'Произведение {index}',
+            year=rng.randint(1900, 2023),
+            description=f'Описание произведения {index}',
+            category_id=rng.randint(1, options.categories),
+        )
+        for index in range(1, options.titles + 1)
+    ))
+    bulk_insert(GenreTitle, (
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id in range(1, options.titles + 1)
+        for genre_id in rng.sample(
+            range(1, options.genres + 1), min(3, options.genres)
+        )
+    ))
+    bulk_insert(Review, (
+        Review(
+            id=index,
+            title_id=index % options.titles + 1,
+            author_id=index // options.titles + 1,
+            text=f'Отзыв {index}',
+            score=rng.randint(1, 10),
+        )
+        for index in range(options.reviews)
+    ))
+    bulk_insert(Comment, (
+        Comment(
+            review_id=rng.randint(0, options.reviews - 1),
+            author_id=rng.randint(1, users_count),
+            text=f'Комментарий {index}',
+        )
+        for index in range(options.comments)
+    ))
+    call_command('rebuild_ratings', stdout=io.StringIO())
+    call_command('rebuild_search_index', stdout=io.StringIO())
+    stdout.write(
+        f'Данные сгенерированы за {time.perf_counter() - started:.1f} с.\n'
+    )
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def measure(call, iterations, warmup=3):
+    """
+    Измеряет вызов: задержку (p50/p95), число SQL-запросов на вызов
+     и пик выделенной памяти.
+
+    Память замеряется отдельным прогоном, чтобы tracemalloc не искажал
+     время.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        call()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = call()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as context:
+        call()
+    queries = len(context.captured_queries)
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'status': getattr(response, 'status_code', None),
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': queries,
+        'peak_alloc_kib': round(peak / 1024, 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path, options, results):
+    """Сохраняет отчёт в JSON со стабильным порядком ключей."""
+    import django
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sizes': {
+                'titles': options.titles,
+                'reviews': options.reviews,
+                'comments': options.comments,
+                'genres': options.genres,
+                'categories': options.categories,
+                'seed': options.seed,
+            },
+        },
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+        report_file.write('\n')
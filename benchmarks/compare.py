@@ -0,0 +1,51 @@
+"""
+Сравнение двух JSON-отчётов бенчмарков.
+
+Пример:
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'peak_alloc_kib')
+
+
+def load(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def change(before, after):
+    if before is None or after is None:
+        return 'n/a'
+    if not before:
+        return f'{after - before:+g}'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    options = parser.parse_args()
+
+    before, after = load(options.before), load(options.after)
+    if before['meta'].get('sizes') != after['meta'].get('sizes'):
+        print('Внимание: отчёты сняты на наборах данных разного размера.')
+    print('{:<24}'.format('scenario') + ''.join(
+        f'{metric:>24}' for metric in METRICS
+    ))
+    for name in sorted(set(before['results']) | set(after['results'])):
+        old = before['results'].get(name, {})
+        new = after['results'].get(name, {})
+        row = f'{name:<24}'
+        for metric in METRICS:
+            old_value, new_value = old.get(metric), new.get(metric)
+            row += '{:>24}'.format(
+                f'{old_value} -> {new_value} ({change(old_value, new_value)})'
+            )
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
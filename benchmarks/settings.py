@@ -0,0 +1,23 @@
+"""Настройки проекта для прогона бенчмарков на отдельной базе SQLite."""
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import AUTH_THROTTLE, BASE_DIR
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BENCH_DB', str(BASE_DIR.parent / 'benchmarks' / 'bench.sqlite3')
+        ),
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Бенчмарк намеренно шлёт поток запросов к эндпоинтам аутентификации.
+AUTH_THROTTLE = {**AUTH_THROTTLE, 'RATES': {}}
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,38 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кэши не очищаются вместе с тестовой БД, поэтому чистим их сами."""
+    from django.core.cache import caches
+
+    from api.throttling import get_bucket_backend
+
+    for cache in caches.all():
+        cache.clear()
+    get_bucket_backend().reset()
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    """Письма отправляются сразу, чтобы тесты видели их в mail.outbox."""
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': True}
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Бюджеты запросов и поиск N+1 проверяются в каждом тесте API."""
+    settings.QUERY_INSPECTOR = {
+        **settings.QUERY_INSPECTOR,
+        'ENABLED': True, 'RAISE': True, 'SAMPLE_RATE': 1.0,
+    }
+
+
+@pytest.fixture(autouse=True)
+def eager_deferred_deletion(settings):
+    """Помеченные к удалению записи удаляются сразу после ответа API."""
+    settings.DEFERRED_DELETION = {
+        **settings.DEFERRED_DELETION, 'EAGER': True
+    }
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        first = create_single_review(admin_client, titles[0]['id'], 'a', 2)
+        create_single_review(user_client, titles[0]['id'], 'b', 8)
+        assert admin_client.get(url).json()['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = admin_client.patch(
+            f'{reviews_url}{first.json()["id"]}/', data={'score': 6}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(url).json()['rating'] == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        admin_client.delete(f'{reviews_url}{first.json()["id"]}/')
+        assert admin_client.get(url).json()['rating'] == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['rating'] is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'a', 3)
+        create_single_review(user_client, titles[0]['id'], 'b', 4)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (7, 2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает сумму и '
+            'количество оценок по таблице отзывов.'
+        )
+        assert title.rating == 3.5
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
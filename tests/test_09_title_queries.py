@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import count_queries, create_titles
+
+TITLES_LIST_QUERIES = 3
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    url = '/api/v1/titles/'
+
+    def create_more_titles(self, count):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for index in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {index}', year=2000, category=category
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre) for genre in genres
+            )
+
+    def test_01_titles_list_query_count_is_fixed(self, client, admin_client):
+        create_titles(admin_client)
+        response, small_page_queries = count_queries(client, self.url)
+        assert response.status_code == HTTPStatus.OK
+
+        self.create_more_titles(15)
+        response, full_page_queries = count_queries(client, self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) > 2
+
+        assert small_page_queries == full_page_queries, (
+            f'Число запросов к БД при GET-запросе к `{self.url}` не должно '
+            'зависеть от количества произведений на странице: '
+            f'{small_page_queries} против {full_page_queries}.'
+        )
+        assert full_page_queries == TITLES_LIST_QUERIES, (
+            f'GET-запрос к `{self.url}` должен выполнять '
+            f'{TITLES_LIST_QUERIES} запроса к БД: подсчёт, выборку '
+            'произведений с категориями и выборку жанров. Выполнено: '
+            f'{full_page_queries}.'
+        )
+
+    def test_02_title_detail_query_count(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response, queries = count_queries(
+            client, f'{self.url}{titles[0]["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert queries == 2, (
+            'GET-запрос к `/api/v1/titles/{title_id}/` должен выполнять '
+            f'2 запроса к БД, выполнено: {queries}.'
+        )
@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.conftest import MANAGE_PATH
+
+CSV_PATH = os.path.join(MANAGE_PATH, 'static', 'data', '')
+
+
+def csv_rows_count(filename):
+    with open(CSV_PATH + filename, encoding='utf-8', newline='') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadCSV:
+
+    @pytest.fixture(autouse=True)
+    def csv_settings(self, settings, tmp_path):
+        settings.CSV_PATH = CSV_PATH
+        self.checkpoint = str(tmp_path / 'checkpoint.json')
+
+    def test_01_batched_load(self):
+        from reviews.management.commands.load_csv import CSV_FILES
+
+        call_command(
+            'load_csv', batch_size=7, checkpoint=self.checkpoint,
+            stdout=io.StringIO()
+        )
+        for filename, model in CSV_FILES:
+            assert model.objects.count() == csv_rows_count(filename), (
+                f'Проверьте, что команда `load_csv` загружает все строки '
+                f'файла `{filename}` при загрузке пачками.'
+            )
+        assert not os.path.exists(self.checkpoint), (
+            'После успешной загрузки журнал `load_csv` должен удаляться.'
+        )
+
+    def test_02_resume_after_crash(self):
+        from reviews.management.commands.load_csv import CSV_FILES
+        from reviews.models import Comment, Title
+
+        call_command(
+            'load_csv', checkpoint=self.checkpoint,
+            stdout=io.StringIO()
+        )
+        committed = 5
+        kept_ids = list(
+            Comment.objects.order_by('id').values_list('id', flat=True)
+        )[:committed + 2]
+        Comment.objects.exclude(id__in=kept_ids).delete()
+        with open(self.checkpoint, 'w', encoding='utf-8') as f:
+            json.dump({
+                'completed': [name for name, _ in CSV_FILES[:-1]],
+                'current': {'comments.csv': committed},
+            }, f)
+
+        call_command(
+            'load_csv', resume=True, batch_size=4,
+            checkpoint=self.checkpoint, stdout=io.StringIO()
+        )
+
+        assert Comment.objects.count() == csv_rows_count('comments.csv'), (
+            'Проверьте, что `load_csv --resume` догружает оставшиеся строки '
+            'прерванного файла, не дублируя уже зафиксированные.'
+        )
+        assert Title.objects.count() == csv_rows_count('titles.csv'), (
+            'Проверьте, что `load_csv --resume` не удаляет уже загруженные '
+            'данные.'
+        )
+
+    def test_03_load_order_follows_foreign_keys(self):
+        from reviews.management.commands.load_csv import CSV_FILES, load_order
+
+        order = [filename for filename, _ in load_order(CSV_FILES[::-1])]
+        for dependent, dependency in (
+            ('titles.csv', 'category.csv'),
+            ('genre_title.csv', 'titles.csv'),
+            ('genre_title.csv', 'genre.csv'),
+            ('review.csv', 'users.csv'),
+            ('review.csv', 'titles.csv'),
+            ('comments.csv', 'review.csv'),
+        ):
+            assert order.index(dependency) < order.index(dependent), (
+                f'Файл `{dependency}` должен загружаться раньше '
+                f'`{dependent}`, который на него ссылается.'
+            )
+
+    @pytest.mark.parametrize('workers', (0, 2))
+    def test_04_invalid_rows_are_rejected(self, settings, tmp_path, workers):
+        from reviews.management.commands.load_csv import CSV_FILES
+
+        for filename, _ in CSV_FILES:
+            with open(CSV_PATH + filename, encoding='utf-8') as source:
+                content = source.read()
+            if filename == 'titles.csv':
+                content = content.replace(',1994,', ',девяносто,', 1)
+            (tmp_path / filename).write_text(content, encoding='utf-8')
+        settings.CSV_PATH = f'{tmp_path}{os.sep}'
+
+        with pytest.raises(CommandError, match='titles.csv, строка 1'):
+            call_command(
+                'load_csv', workers=workers, checkpoint=self.checkpoint,
+                stdout=io.StringIO()
+            )
+
+    def test_05_incremental_load(self, settings, tmp_path):
+        from reviews.management.commands.load_csv import CSV_FILES
+        from reviews.models import Comment, Genre, Title
+
+        call_command(
+            'load_csv', checkpoint=self.checkpoint, stdout=io.StringIO()
+        )
+        output = io.StringIO()
+        call_command(
+            'load_csv', incremental=True, checkpoint=self.checkpoint,
+            stdout=output
+        )
+        for filename, _ in CSV_FILES:
+            assert f'{filename}: добавлено 0, обновлено 0' in (
+                output.getvalue()
+            ), (
+                'Проверьте, что `load_csv --incremental` с теми же файлами '
+                f'не перезаписывает строки `{filename}`.'
+            )
+        titles_before = set(Title.objects.values_list('id', 'name'))
+        removed_comment = Comment.objects.order_by('-id').first()
+
+        for filename, _ in CSV_FILES:
+            with open(CSV_PATH + filename, encoding='utf-8') as source:
+                content = source.read()
+            if filename == 'genre.csv':
+                content = content.replace('1,Драма,drama', '1,Трагедия,drama')
+                content = content.rstrip('\n') + '\n99,Нуар,noir\n'
+            if filename == 'comments.csv':
+                content = content[:content.rindex(f'\n{removed_comment.id},')]
+            (tmp_path / filename).write_text(content, encoding='utf-8')
+        settings.CSV_PATH = f'{tmp_path}{os.sep}'
+
+        call_command(
+            'load_csv', incremental=True, checkpoint=self.checkpoint,
+            stdout=io.StringIO()
+        )
+
+        assert Genre.objects.get(pk=1).name == 'Трагедия', (
+            'Проверьте, что `load_csv --incremental` обновляет изменённые '
+            'записи.'
+        )
+        assert Genre.objects.filter(pk=99, slug='noir').exists(), (
+            'Проверьте, что `load_csv --incremental` добавляет новые записи.'
+        )
+        assert not Comment.objects.filter(pk=removed_comment.pk).exists(), (
+            'Проверьте, что `load_csv --incremental` удаляет записи, '
+            'отсутствующие в файлах.'
+        )
+        assert set(Title.objects.values_list('id', 'name')) == titles_before, (
+            'Проверьте, что `load_csv --incremental` не затрагивает '
+            'неизменённые записи.'
+        )
+
+    def test_06_incremental_refreshes_only_changed_titles(
+            self, settings, tmp_path
+    ):
+        from django.db.models import Avg
+
+        from reviews.management.commands.load_csv import CSV_FILES
+        from reviews.models import Review, Title
+
+        call_command(
+            'load_csv', checkpoint=self.checkpoint, stdout=io.StringIO()
+        )
+        output = io.StringIO()
+        call_command(
+            'load_csv', incremental=True, checkpoint=self.checkpoint,
+            stdout=output
+        )
+        assert 'Пересчитываю' not in output.getvalue(), (
+            'Проверьте, что `load_csv --incremental` без изменений не '
+            'перестраивает рейтинги и поисковый индекс целиком.'
+        )
+
+        review = Review.objects.get(pk=1)
+        for filename, _ in CSV_FILES:
+            with open(CSV_PATH + filename, encoding='utf-8') as source:
+                content = source.read()
+            if filename == 'review.csv':
+                content = content.replace(
+                    f',{review.author_id},{review.score},',
+                    f',{review.author_id},1,', 1
+                )
+            (tmp_path / filename).write_text(content, encoding='utf-8')
+        settings.CSV_PATH = f'{tmp_path}{os.sep}'
+        output = io.StringIO()
+        call_command(
+            'load_csv', incremental=True, checkpoint=self.checkpoint,
+            stdout=output
+        )
+        assert 'review.csv: добавлено 0, обновлено 1' in output.getvalue()
+        assert 'Пересчитаны рейтинги произведений: 1' in output.getvalue()
+        expected = Review.objects.filter(
+            title_id=review.title_id
+        ).aggregate(rating=Avg('score'))['rating']
+        assert Title.objects.get(
+            pk=review.title_id
+        ).rating == pytest.approx(expected), (
+            'Проверьте, что `load_csv --incremental` пересчитывает рейтинг '
+            'произведений с изменёнными отзывами.'
+        )
+
+    def test_07_incremental_keeps_users_missing_from_csv(self):
+        from reviews.models import User
+
+        call_command(
+            'load_csv', checkpoint=self.checkpoint, stdout=io.StringIO()
+        )
+        User.objects.create(username='api-user', email='api@yamdb.fake')
+        call_command(
+            'load_csv', incremental=True, checkpoint=self.checkpoint,
+            stdout=io.StringIO()
+        )
+        assert User.objects.filter(username='api-user').exists(), (
+            'Проверьте, что `load_csv --incremental` не удаляет '
+            'пользователей, которых нет в users.csv.'
+        )
+        call_command(
+            'load_csv', incremental=True, delete_missing_users=True,
+            checkpoint=self.checkpoint, stdout=io.StringIO()
+        )
+        assert not User.objects.filter(username='api-user').exists()
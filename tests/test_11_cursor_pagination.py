@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+REVIEWS_COUNT = 23
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    def create_reviews(self, django_user_model, title_id):
+        from reviews.models import Review
+
+        for index in range(REVIEWS_COUNT):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{index}',
+                email=f'reviewer{index}@yamdb.fake',
+            )
+            Review.objects.create(
+                author=author, title_id=title_id, text=f'text {index}',
+                score=index % 10 + 1
+            )
+
+    def test_01_reviews_cursor_pagination(self, client, admin_client,
+                                          django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        self.create_reviews(django_user_model, titles[0]['id'])
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == REVIEWS_COUNT, (
+            f'По умолчанию `{url}` должен использовать постраничную '
+            'пагинацию с ключом `count`.'
+        )
+
+        seen = []
+        next_url = f'{url}?pagination=cursor'
+        while next_url:
+            response = client.get(next_url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Курсорная пагинация не должна считать общее число записей.'
+            )
+            seen.extend(review['id'] for review in data['results'])
+            next_url = data['next']
+
+        from reviews.models import Review
+        expected = list(
+            Review.objects.filter(title_id=titles[0]['id'])
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсорная пагинация по `(pub_date, id)` обходит '
+            'все отзывы без пропусков и повторов.'
+        )
+
+    def test_02_comments_cursor_pagination(self, client, admin_client, admin):
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            author=admin, title_id=titles[0]['id'], text='text', score=5
+        )
+        Comment.objects.bulk_create(
+            Comment(author=admin, review=review, text=f'comment {index}')
+            for index in range(15)
+        )
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/'
+               'comments/?pagination=cursor')
+
+        first_page = client.get(url).json()
+        second_page = client.get(first_page['next']).json()
+        ids = [comment['id'] for comment in first_page['results']]
+        ids += [comment['id'] for comment in second_page['results']]
+        assert len(ids) == len(set(ids)) == 15, (
+            'Проверьте, что курсорная пагинация комментариев обходит все '
+            'комментарии без пропусков и повторов.'
+        )
+        assert second_page['next'] is None
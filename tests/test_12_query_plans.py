@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+CHECKED_TABLES = ('reviews_review', 'reviews_comment')
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def check_plans(context, url):
+    checked = 0
+    for query in context.captured_queries:
+        sql = query['sql']
+        if not sql.startswith('SELECT') or not any(
+            f'FROM "{table}"' in sql for table in CHECKED_TABLES
+        ):
+            continue
+        checked += 1
+        plan = query_plan(sql)
+        for step in plan:
+            assert 'TEMP B-TREE' not in step, (
+                f'Запрос к `{url}` сортирует строки во временном B-дереве, '
+                f'а не читает их по индексу.\n{sql}\n{plan}'
+            )
+            assert not any(
+                step.startswith(f'SCAN {table}') for table in CHECKED_TABLES
+            ), (
+                f'Запрос к `{url}` полностью сканирует таблицу.\n{sql}\n{plan}'
+            )
+    assert checked, f'Не найдено запросов к отзывам или комментариям: {url}'
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test12QueryPlans:
+
+    def test_01_review_and_comment_lists_use_indexes(self, client,
+                                                     admin_client,
+                                                     user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'text', 5
+        ).json()
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        admin_client.post(comments_url, data={'text': 'comment'})
+
+        for url in (
+            reviews_url,
+            f'{reviews_url}?pagination=cursor',
+            comments_url,
+            f'{comments_url}?pagination=cursor',
+        ):
+            with CaptureQueriesContext(connection) as context:
+                client.get(url)
+            check_plans(context, url)
+
+    def test_02_review_uniqueness_check_uses_index(self, admin_client,
+                                                   user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            user_client.post(reviews_url, data={'text': 'text', 'score': 5})
+        check_plans(context, reviews_url)
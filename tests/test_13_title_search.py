@@ -0,0 +1,70 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+
+    url = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.url, {'search': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` с параметром `search` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'терм') == ['Терминатор'], (
+            'Проверьте, что параметр `search` находит произведения по началу '
+            'слова в названии.'
+        )
+        assert self.search(client, 'YIPPIE') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет без учёта регистра и по '
+            'описанию произведения.'
+        )
+        assert self.search(client, 'терминатор орешек') == [], (
+            'Проверьте, что параметр `search` требует совпадения всех слов.'
+        )
+        assert self.search(client, '"*:') == []
+
+    def test_02_search_ranks_name_matches_first(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[1]["id"]}/',
+            data={'description': 'Не терминатор, но тоже хорош'}
+        )
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+
+    def test_03_index_follows_title_changes(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чужой') == ['Чужой']
+
+        admin_client.delete(f'{self.url}{titles[0]["id"]}/')
+        assert self.search(client, 'чужой') == []
+
+        Title.objects.filter(pk=titles[1]['id']).update(name='Хищник')
+        assert self.search(client, 'хищник') == []
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        assert self.search(client, 'хищник') == ['Хищник'], (
+            'Проверьте, что команда `rebuild_search_index` перестраивает '
+            'поисковый индекс.'
+        )
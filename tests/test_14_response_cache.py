@@ -0,0 +1,72 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import count_queries, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_repeated_get_is_served_from_cache(self, client, admin_client):
+        create_titles(admin_client)
+        for url in ('/api/v1/genres/', '/api/v1/categories/',
+                    '/api/v1/titles/', '/api/v1/titles/?year=1984'):
+            response = client.get(url)
+            assert response['X-Cache'] == 'MISS'
+            cached_response, queries = count_queries(client, url)
+            assert cached_response['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+                'кэша.'
+            )
+            assert queries == 0, (
+                f'Ответ на GET-запрос к `{url}` из кэша не должен обращаться '
+                f'к БД, выполнено запросов: {queries}.'
+            )
+            assert cached_response.json() == response.json()
+
+    def test_02_writes_invalidate_cache(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get('/api/v1/genres/')
+        client.get(title_url)
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что создание жанра сбрасывает кэш списка жанров.'
+        )
+        assert response.json()['count'] == len(genres) + 1
+
+        create_single_review(admin_client, titles[0]['id'], 'text', 9)
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений.'
+        )
+        assert response.json()['rating'] == 9
+
+        admin_client.patch(title_url, data={'genre': ['western']})
+        response = client.get(title_url)
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'western'
+        ], 'Проверьте, что изменение жанров сбрасывает кэш произведений.'
+
+    def test_03_cache_respects_permissions_and_stats(self, client,
+                                                     user_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        response = user_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        output = io.StringIO()
+        call_command('cache_stats', stdout=output)
+        assert 'genres: попаданий 1, промахов 1' in output.getvalue(), (
+            'Проверьте, что команда `cache_stats` выводит счётчики '
+            'попаданий и промахов кэша.'
+        )
@@ -0,0 +1,155 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (count_queries, create_single_comment,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    @pytest.fixture(autouse=True)
+    def conditional_get(self, settings):
+        """Тест выполняется в одном процессе, и locmem для него общий."""
+        settings.API_RESPONSE_CACHE = {
+            **settings.API_RESPONSE_CACHE, 'CONDITIONAL_GET': True
+        }
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response, queries = count_queries(
+            client, url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert queries == 0, (
+            f'Ответ 304 на GET-запрос к `{url}` не должен обращаться к БД, '
+            f'выполнено запросов: {queries}.'
+        )
+        return etag
+
+    def test_01_reviews_and_comments(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'text', 5
+        ).json()
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+        other_reviews_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        other_etag = self.check_not_modified(client, other_reviews_url)
+
+        create_single_review(user_client, titles[0]['id'], 'other', 7)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет `ETag` списка отзывов.'
+        )
+        response = client.get(
+            other_reviews_url, HTTP_IF_NONE_MATCH=other_etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Отзыв на одно произведение не должен менять `ETag` отзывов на '
+            'другие произведения.'
+        )
+
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'comment'
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет `ETag` списка '
+            'комментариев.'
+        )
+
+    def test_02_titles(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = self.check_not_modified(client, title_url)
+        self.check_not_modified(client, '/api/v1/titles/')
+
+        admin_client.patch(title_url, data={'name': 'Терминатор 2'})
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение произведения меняет его `ETag`.'
+        )
+        assert response.json()['name'] == 'Терминатор 2'
+
+        response = client.get(
+            title_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что GET-запрос с `If-Modified-Since` не раньше '
+            '`Last-Modified` возвращает ответ со статусом 304.'
+        )
+
+    def test_03_disabled_without_shared_cache(self, settings, client,
+                                              admin_client):
+        titles, _, _ = create_titles(admin_client)
+        settings.API_RESPONSE_CACHE = {
+            **settings.API_RESPONSE_CACHE, 'CONDITIONAL_GET': False
+        }
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'ETag' not in response and 'Last-Modified' not in response, (
+            'Проверьте, что без общего хранилища версий ответы не содержат '
+            'валидаторов `ETag` и `Last-Modified`.'
+        )
+
+    def test_04_author_rename_changes_validators(self, client, admin_client,
+                                                 user, user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 5
+        ).json()
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        create_single_comment(user_client, titles[0]['id'], review['id'], 'c')
+        etags = {
+            url: self.check_not_modified(client, url)
+            for url in (reviews_url, comments_url)
+        }
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что смена имени автора меняет `ETag` списков '
+                f'его отзывов и комментариев: {url}'
+            )
+            assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_05_marked_title_changes_comment_validators(
+            self, settings, client, admin_client
+    ):
+        settings.DEFERRED_DELETION = {
+            **settings.DEFERRED_DELETION, 'EAGER': False
+        }
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'text', 5
+        ).json()
+        comments_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}'
+            '/comments/'
+        )
+        etag = self.check_not_modified(client, comments_url)
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии произведения, помеченного к '
+            'удалению, не отдаются ответом 304.'
+        )
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    from api.authentication import StatelessJWTAuthentication
+    from api.views import ReviewViewSet, TitleViewSet, UserViewSet
+
+    for viewset in (ReviewViewSet, TitleViewSet, UserViewSet):
+        monkeypatch.setattr(
+            viewset, 'authentication_classes', (StatelessJWTAuthentication,)
+        )
+
+
+def stateless_client(user):
+    from api.utils import get_auth_jwt_token
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_auth_jwt_token(user)["access"]}'
+    )
+    return client
+
+
+def user_table_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if '"users_customuser"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('stateless_auth')
+class Test16StatelessAuth:
+
+    def test_01_requests_do_not_load_user(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        client = stateless_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data={'text': 'text', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert user_table_queries(context) == [], (
+            'Проверьте, что StatelessJWTAuthentication не загружает '
+            'пользователя из БД при известном состоянии пользователя.'
+        )
+
+        review_url = f'{url}{response.json()["id"]}/'
+        response = client.patch(review_url, data={'text': 'new'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Автор должен иметь право изменять свой отзыв при '
+            'аутентификации по claims токена.'
+        )
+
+    def test_02_me_returns_full_profile(self, user):
+        response = stateless_client(user).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email, (
+            'Эндпоинт `/api/v1/users/me/` должен возвращать данные профиля '
+            'из БД, а не из токена.'
+        )
+
+    def test_03_role_change_and_blocking_apply_immediately(self, admin):
+        client = stateless_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+
+        admin.role = admin.SIMPLE_USER
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что смена роли действует на уже выданные токены.'
+
+        admin.is_active = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что заблокированный пользователь не аутентифицируется.'
+
+    def test_04_tokens_without_claims_still_work(self, admin_client):
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
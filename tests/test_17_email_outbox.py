@@ -0,0 +1,123 @@
+import io
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+@pytest.fixture
+def deferred_outbox(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+
+
+def signup(client, number):
+    return client.post(SIGNUP_URL, data={
+        'username': f'user{number}', 'email': f'user{number}@yamdb.fake'
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('deferred_outbox')
+class Test17EmailOutbox:
+
+    def test_01_signup_does_not_wait_for_mail(self, client):
+        from users.models import OutgoingEmail
+
+        response = signup(client, 1)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что эндпоинт регистрации не отправляет письмо '
+            'в процессе запроса, а ставит его в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'user1@yamdb.fake'
+        assert email.sent_at is None
+
+        call_command('send_emails', '--once', stdout=io.StringIO())
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['user1@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None, (
+            'Отправленное письмо должно быть отмечено в очереди.'
+        )
+        assert email.message == '', (
+            'Проверьте, что после отправки текст письма с кодом '
+            'подтверждения не хранится в очереди.'
+        )
+
+    def test_02_batch_uses_single_connection(self, client, monkeypatch):
+        from users.outbox import deliver_pending
+
+        opened = []
+        original_open = EmailBackend.open
+        monkeypatch.setattr(
+            EmailBackend, 'open',
+            lambda self: opened.append(self) or original_open(self),
+        )
+        for number in range(5):
+            signup(client, number)
+
+        assert deliver_pending(batch_size=10) == (5, 0)
+        assert len(mail.outbox) == 5
+        assert len(opened) == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+
+    def test_03_failed_messages_are_retried(self, client, monkeypatch):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending
+
+        def fail(self, messages):
+            raise ConnectionError('server unavailable')
+
+        signup(client, 1)
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'send_messages', fail)
+            assert deliver_pending() == (0, 1)
+
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'server unavailable' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Повторная попытка должна откладываться.'
+        )
+        assert deliver_pending() == (0, 0)
+
+        OutgoingEmail.objects.update(
+            send_after=timezone.now() - timedelta(seconds=1)
+        )
+        assert deliver_pending() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    def test_04_gives_up_after_max_attempts(self, client, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending
+
+        signup(client, 1)
+        OutgoingEmail.objects.update(
+            attempts=settings.EMAIL_OUTBOX['MAX_ATTEMPTS']
+        )
+        assert deliver_pending() == (0, 0)
+        assert len(mail.outbox) == 0
+
+    def test_05_admin_hides_message(self, client, user_superuser):
+        from users.models import OutgoingEmail
+
+        signup(client, 1)
+        email = OutgoingEmail.objects.get()
+        client.force_login(user_superuser)
+        response = client.get(
+            f'/admin/users/outgoingemail/{email.pk}/change/'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert email.message not in response.content.decode(), (
+            'Проверьте, что панель администратора не показывает текст '
+            'письма с кодом подтверждения.'
+        )
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def throttle_settings(settings):
+    from api.throttling import get_bucket_backend
+
+    def configure(backend='api.throttling.LocalBucketBackend', **rates):
+        settings.AUTH_THROTTLE = {
+            'BACKEND': backend, 'OPTIONS': {}, 'RATES': rates
+        }
+        get_bucket_backend.cache_clear()
+
+    yield configure
+    get_bucket_backend.cache_clear()
+
+
+def signup(client, username, ip='10.0.0.1'):
+    return client.post(
+        SIGNUP_URL,
+        data={'username': username, 'email': f'{username}@yamdb.fake'},
+        REMOTE_ADDR=ip,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18AuthThrottling:
+
+    @pytest.mark.parametrize('backend', (
+        'api.throttling.LocalBucketBackend',
+        'api.throttling.CacheBucketBackend',
+    ))
+    def test_01_ip_bucket(self, client, throttle_settings, backend):
+        throttle_settings(backend, signup_ip='3/min')
+        for number in range(3):
+            assert signup(client, f'user{number}').status_code == (
+                HTTPStatus.OK
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = signup(client, 'user3')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что после исчерпания лимита эндпоинт регистрации '
+            'отвечает 429.'
+        )
+        assert 0 < int(response['Retry-After']) <= 20
+        assert len(context.captured_queries) == 0, (
+            'Отклонённый запрос не должен обращаться к базе данных.'
+        )
+        assert signup(client, 'user3', ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        ), 'Лимит по IP не должен распространяться на другие адреса.'
+
+    def test_02_username_bucket(self, client, throttle_settings):
+        throttle_settings(token_username='2/min')
+        for number in range(2):
+            response = client.post(
+                TOKEN_URL,
+                data={'username': 'Victim', 'confirmation_code': 'wrong'},
+                REMOTE_ADDR=f'10.0.1.{number}',
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(
+            TOKEN_URL,
+            data={'username': 'victim', 'confirmation_code': 'wrong'},
+            REMOTE_ADDR='10.0.1.9',
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что перебор кода для одного пользователя с разных '
+            'адресов ограничивается лимитом по имени пользователя.'
+        )
+
+    def test_03_disabled_scope(self, client, throttle_settings):
+        throttle_settings(signup_ip=None)
+        for number in range(30):
+            assert signup(client, f'user{number}').status_code == (
+                HTTPStatus.OK
+            )
+
+    def test_04_non_object_body(self, client, throttle_settings):
+        throttle_settings(signup_username='5/min', token_username='5/min')
+        for url in (SIGNUP_URL, TOKEN_URL):
+            response = client.post(url, data=[], content_type=(
+                'application/json'
+            ))
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` с JSON-массивом '
+                'вместо объекта возвращает ответ со статусом 400.'
+            )
+
+
+class TestTokenBucket:
+
+    def test_refill(self, monkeypatch):
+        from api import throttling
+
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        backend = throttling.LocalBucketBackend()
+        assert [backend.consume('key', 2, 60) for _ in range(2)] == [0, 0]
+        assert backend.consume('key', 2, 60) == pytest.approx(30)
+        now[0] += 30
+        assert backend.consume('key', 2, 60) == 0, (
+            'Корзина должна пополняться равномерно за период.'
+        )
+        assert backend.consume('key', 2, 60) > 0
+
+    def test_prune_keeps_active_buckets(self, monkeypatch):
+        from api import throttling
+
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        backend = throttling.LocalBucketBackend(max_keys=2)
+        backend.consume('old', 1, 1)
+        backend.consume('slow', 1, 3600)
+        now[0] += 10
+        backend.consume('new', 1, 1)
+        assert set(backend.buckets) == {'slow', 'new'}
+        assert backend.consume('slow', 1, 3600) > 0
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import count_queries
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+# BEGIN, поиск пользователя, создание пользователя, постановка письма в
+# очередь.
+NEW_USER_QUERIES = 4
+# BEGIN, поиск пользователя, постановка письма в очередь.
+EXISTING_USER_QUERIES = 3
+
+
+@pytest.fixture(autouse=True)
+def deferred_outbox(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SignupQueries:
+
+    data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+
+    def test_01_new_user(self, client, django_user_model):
+        response, queries = count_queries(
+            client, SIGNUP_URL, method='post', data=self.data
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert django_user_model.objects.filter(**self.data).exists()
+        assert queries == NEW_USER_QUERIES, (
+            'Проверьте, что регистрация нового пользователя проверяет '
+            'username и email одним запросом. Запросов к БД: '
+            f'{queries}, ожидалось {NEW_USER_QUERIES}.'
+        )
+
+    def test_02_existing_user(self, client):
+        client.post(SIGNUP_URL, data=self.data)
+        response, queries = count_queries(
+            client, SIGNUP_URL, method='post', data=self.data
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert queries == EXISTING_USER_QUERIES, (
+            'Проверьте, что повторный запрос кода использует найденного '
+            'при проверке пользователя, а не запрашивает его снова. '
+            f'Запросов к БД: {queries}, ожидалось {EXISTING_USER_QUERIES}.'
+        )
+
+    def test_03_username_and_email_of_different_users(self, client):
+        client.post(SIGNUP_URL, data=self.data)
+        client.post(
+            SIGNUP_URL,
+            data={'username': 'other', 'email': 'other@yamdb.fake'},
+        )
+        response = client.post(
+            SIGNUP_URL,
+            data={'username': 'new_user', 'email': 'other@yamdb.fake'},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если username и email принадлежат разным пользователям, '
+            'должен возвращаться ответ со статусом 400.'
+        )
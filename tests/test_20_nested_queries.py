@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import count_queries, create_authors_reviews, create_titles
+
+# COUNT для номеров страниц и выборка отзывов вместе с авторами.
+PAGE_QUERIES = 2
+# Курсорная пагинация обходится без COUNT.
+CURSOR_QUERIES = 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20NestedQueries:
+
+    def create_reviews(self, title_id, count):
+        from reviews.models import Comment, Review
+
+        authors = create_authors_reviews(title_id, count)
+        review = Review.objects.filter(title_id=title_id).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='text')
+            for author in authors
+        )
+        return review
+
+    def test_01_reviews_list(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        self.create_reviews(titles[0]['id'], 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response, queries = count_queries(client, url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 5
+        assert queries == PAGE_QUERIES, (
+            'Проверьте, что список отзывов фильтруется по `title_id` без '
+            'отдельного запроса произведения, а авторы выбираются вместе с '
+            f'отзывами. Запросов к БД: {queries}, ожидалось {PAGE_QUERIES}.'
+        )
+        response, queries = count_queries(client, f'{url}?pagination=cursor')
+        assert response.status_code == HTTPStatus.OK
+        assert queries == CURSOR_QUERIES
+
+    def test_02_comments_list(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = self.create_reviews(titles[0]['id'], 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/comments/'
+
+        response, queries = count_queries(client, url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 5
+        assert queries == PAGE_QUERIES, (
+            'Проверьте, что список комментариев фильтруется по `review_id` '
+            'без отдельного запроса отзыва. Запросов к БД: '
+            f'{queries}, ожидалось {PAGE_QUERIES}.'
+        )
+
+    def test_03_empty_list_and_missing_parent(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = self.create_reviews(titles[0]['id'], 1)
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+
+        response = client.get('/api/v1/titles/9999/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для несуществующего произведения список отзывов '
+            'возвращает 404.'
+        )
+        response = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review.id}/comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва, запрошенные через чужое '
+            'произведение, возвращают 404.'
+        )
+
+    def test_04_create_looks_up_parent_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                url, data={'text': 'text', 'score': 5}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        title_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что при создании отзыва произведение запрашивается '
+            'один раз за запрос.'
+        )
+        response = admin_client.post(
+            '/api/v1/titles/9999/reviews/', data={'text': 'text', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_authors_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryInspector:
+
+    def test_01_n_plus_one_is_reported_with_origin(
+            self, client, admin_client, monkeypatch, settings
+    ):
+        from api.querylog import QueryBudgetExceeded
+        from api.views import ReviewViewSet
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        create_authors_reviews(titles[0]['id'], 6)
+        settings.FAST_READ_SERIALIZERS = False
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: Review.objects.filter(title_id=self.kwargs['title_id'])
+        )
+        with pytest.raises(QueryBudgetExceeded) as error:
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        message = str(error.value)
+        assert 'ReviewViewSet.list' in message
+        assert 'ReviewSerializer.author' in message, (
+            'Проверьте, что для повторяющихся запросов указывается поле '
+            'сериализатора, из которого они выполнены.'
+        )
+
+    def test_02_budget_is_enforced(self, client, admin_client, settings):
+        from api.querylog import QueryBudgetExceeded
+
+        create_titles(admin_client)
+        settings.QUERY_INSPECTOR = {
+            **settings.QUERY_INSPECTOR,
+            'BUDGETS': {'TitleViewSet.list': 1},
+        }
+        with pytest.raises(QueryBudgetExceeded, match='бюджет 1 превышен'):
+            client.get('/api/v1/titles/')
+
+    def test_03_warning_without_raise(
+            self, client, admin_client, settings, caplog
+    ):
+        create_titles(admin_client)
+        settings.QUERY_INSPECTOR = {
+            **settings.QUERY_INSPECTOR,
+            'RAISE': False,
+            'BUDGETS': {'TitleViewSet': 1},
+        }
+        with caplog.at_level('WARNING', logger='api.queries'):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'TitleViewSet.list' in caplog.text, (
+            'Без RAISE превышение бюджета должно записываться в лог.'
+        )
+
+    def test_04_record_queries_helper(self, admin_client):
+        from api.querylog import fingerprint, record_queries
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        with record_queries() as recorder:
+            for title in titles:
+                Title.objects.filter(pk=title['id']).exists()
+            list(Title.objects.filter(pk__in=[1, 2, 3]))
+        assert len(recorder) == len(titles) + 1
+        assert fingerprint(
+            'SELECT 1 WHERE id IN (%s, %s, %s)'
+        ) == fingerprint('SELECT 1 WHERE id IN (%s, %s)')
+        assert list(recorder.repeated(threshold=len(titles)).values()) == [
+            (len(titles), {None})
+        ]
+
+    def test_05_sampling(self, client, admin_client, settings, caplog):
+        create_titles(admin_client)
+        settings.QUERY_INSPECTOR = {
+            **settings.QUERY_INSPECTOR,
+            'RAISE': False,
+            'SAMPLE_RATE': 0,
+            'BUDGETS': {'TitleViewSet': 1},
+        }
+        with caplog.at_level('WARNING', logger='api.queries'):
+            client.get('/api/v1/titles/')
+        assert 'TitleViewSet.list' not in caplog.text, (
+            'Проверьте, что проверяется только доля запросов '
+            '`QUERY_INSPECTOR["SAMPLE_RATE"]`.'
+        )
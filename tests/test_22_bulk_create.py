@@ -0,0 +1,187 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import count_queries, create_titles
+
+REVIEWS_URL = '/api/v1/bulk/reviews/'
+COMMENTS_URL = '/api/v1/bulk/comments/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkCreate:
+
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        for api_client, expected in (
+            (client, HTTPStatus.UNAUTHORIZED),
+            (user_client, HTTPStatus.FORBIDDEN),
+            (moderator_client, HTTPStatus.FORBIDDEN),
+        ):
+            response = api_client.post(
+                REVIEWS_URL, data='[]', content_type='application/json'
+            )
+            assert response.status_code == expected, (
+                'Проверьте, что пакетная загрузка доступна только '
+                'администратору.'
+            )
+
+    def test_02_reviews_json(self, admin_client, admin, user):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        admin_client.post(
+            f'/api/v1/titles/{second}/reviews/', data={'text': 't', 'score': 1}
+        )
+        items = [
+            {'title': first, 'text': 'отлично', 'score': 10},
+            {'title': first, 'author': user.username, 'text': 'а', 'score': 4},
+            {'title': first, 'author': user.username, 'text': 'б', 'score': 5},
+            {'title': second, 'text': 'повтор', 'score': 3},
+            {'title': 9999, 'text': 'нет произведения', 'score': 3},
+            {'title': first, 'author': 'nobody', 'text': 'в', 'score': 3},
+            {'title': first, 'text': 'оценка', 'score': 11},
+        ]
+        response = admin_client.post(REVIEWS_URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['created'] == 2
+        assert data['errors'] == 5
+        assert [result['status'] for result in data['results']] == [
+            'created', 'created', 'error', 'error', 'error', 'error', 'error'
+        ], 'Проверьте, что результат возвращается для каждого элемента.'
+        assert [result['index'] for result in data['results']] == list(
+            range(len(items))
+        )
+        assert 'score' in data['results'][6]['errors']
+        assert Review.objects.filter(title_id=first).count() == 2
+
+        title = Title.objects.get(pk=first)
+        assert (title.rating_count, title.rating) == (2, 7), (
+            'Проверьте, что после пакетной загрузки обновляется рейтинг '
+            'произведений.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{first}/')
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что пакетная загрузка сбрасывает кэш ответов.'
+        )
+
+    def test_03_query_count_does_not_depend_on_size(self, admin_client):
+        from users.models import CustomUser
+
+        titles, _, _ = create_titles(admin_client)
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'author{index}', email=f'{index}@yamdb.fake')
+            for index in range(20)
+        )
+
+        def post(count):
+            return count_queries(
+                admin_client, REVIEWS_URL, method='post', format='json',
+                data=[
+                    {'title': titles[count % 2]['id'], 'text': 't',
+                     'score': 5, 'author': f'author{index}'}
+                    for index in range(count - 10, count)
+                ],
+            )
+
+        small, small_queries = post(10)
+        large, large_queries = post(20)
+        assert small.json()['created'] == large.json()['created'] == 10
+        assert small_queries == large_queries, (
+            'Проверьте, что число запросов пакетной загрузки не зависит '
+            'от размера пакета.'
+        )
+
+    def test_04_comments_ndjson(self, admin_client, user):
+        from reviews.models import Comment
+
+        titles, _, _ = create_titles(admin_client)
+        review_id = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 't', 'score': 1},
+        ).json()['id']
+        lines = [
+            {'review': review_id, 'text': 'первый'},
+            {'review': review_id, 'author': user.username, 'text': 'второй'},
+            {'review': 9999, 'text': 'нет отзыва'},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\n\n'
+        response = admin_client.post(
+            COMMENTS_URL, data=body, content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['created'] == 2
+        assert 'review' in response.json()['results'][2]['errors']
+        assert Comment.objects.filter(review_id=review_id).count() == 2
+
+        response = admin_client.post(
+            COMMENTS_URL, data='{"review": 1\n',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_not_a_list(self, admin_client, settings):
+        response = admin_client.post(
+            REVIEWS_URL, data={'title': 1}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        settings.BULK_CREATE_MAX_ITEMS = 1
+        response = admin_client.post(
+            REVIEWS_URL, data=[{}, {}], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_concurrent_review_becomes_item_error(
+            self, admin_client, admin, user, monkeypatch
+    ):
+        from api.bulk import BulkReviewView
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        build_objects = BulkReviewView.build_objects
+        calls = []
+
+        def build_objects_then_race(view, valid):
+            objects = build_objects(view, valid)
+            if not calls:
+                # Отзыв появляется между проверкой пакета и его записью.
+                Review.objects.create(
+                    title_id=title_id, author=user, text='параллельно',
+                    score=2,
+                )
+            calls.append(len(objects))
+            return objects
+
+        monkeypatch.setattr(
+            BulkReviewView, 'build_objects', build_objects_then_race
+        )
+        response = admin_client.post(REVIEWS_URL, data=[
+            {'title': title_id, 'text': 'а', 'score': 10},
+            {'title': title_id, 'author': user.username, 'text': 'б',
+             'score': 4},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что нарушение уникальности при записи пакета '
+            'возвращается ошибкой элемента, а не ошибкой сервера.'
+        )
+        data = response.json()
+        assert (data['created'], data['errors']) == (1, 1)
+        assert [result['status'] for result in data['results']] == [
+            'created', 'error'
+        ]
+        assert calls == [2, 1]
+        assert Review.objects.filter(title_id=title_id).count() == 2
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            12, 2, 6
+        ), (
+            'Проверьте, что пакетная загрузка добавляет оценки пакета к '
+            'рейтингу произведения.'
+        )
+        assert (
+            title.score_2_count, title.score_4_count, title.score_10_count
+        ) == (1, 0, 1)
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+CSV_PATH = os.path.join(MANAGE_PATH, 'static', 'data', '')
+
+
+def snapshot():
+    """
+    Выгружаемые поля всех наборов, кроме дат публикации: load_csv их не
+     загружает (auto_now_add).
+    """
+    from reviews.export import DATASETS
+
+    return {
+        dataset: list(model.objects.order_by('pk').values(*(
+            field for _, field in columns if field != 'pub_date'
+        )))
+        for dataset, (model, columns) in DATASETS.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Export:
+
+    @pytest.fixture(autouse=True)
+    def load_data(self, settings, tmp_path):
+        settings.CSV_PATH = CSV_PATH
+        call_command(
+            'load_csv', workers=0, checkpoint=str(tmp_path / 'checkpoint'),
+            stdout=io.StringIO(),
+        )
+
+    def test_01_round_trip_through_load_csv(self, settings, tmp_path):
+        from reviews.export import DATASETS
+
+        before = snapshot()
+        output = tmp_path / 'export'
+        call_command(
+            'export_csv', str(output), datasets=list(DATASETS),
+            chunk_size=3, stdout=io.StringIO(),
+        )
+        settings.CSV_PATH = f'{output}{os.sep}'
+        call_command(
+            'load_csv', workers=0, checkpoint=str(tmp_path / 'checkpoint'),
+            stdout=io.StringIO(),
+        )
+        assert snapshot() == before, (
+            'Проверьте, что файлы `export_csv` загружаются командой '
+            '`load_csv` без потерь.'
+        )
+
+    def test_02_stdout_ndjson(self):
+        from reviews.models import Title
+
+        out = io.StringIO()
+        call_command('export_csv', '-', datasets=['titles'], format='ndjson',
+                     stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(rows) == Title.objects.count()
+        title = Title.objects.order_by('pk').first()
+        assert rows[0] == {
+            'id': title.id, 'name': title.name, 'year': title.year,
+            'category': title.category_id,
+            'description': title.description, 'rating': title.rating,
+        }
+
+    def test_03_endpoint(self, admin_client, user_client):
+        from reviews.models import Review
+
+        response = admin_client.get('/api/v1/export/review.csv')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком.'
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == Review.objects.count()
+        assert list(rows[0]) == [
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ]
+
+        response = admin_client.get('/api/v1/export/genre.ndjson')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+
+        assert admin_client.get('/api/v1/export/users.csv').status_code == (
+            HTTPStatus.NOT_FOUND
+        ), 'Пользователи не должны выгружаться через API.'
+        assert user_client.get('/api/v1/export/titles.csv').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_04_pending_deletion_is_hidden(self):
+        from django.db.models import Q
+
+        from reviews.export import DATASETS, export_rows
+        from reviews.models import Comment, GenreTitle, Review, Title, User
+
+        title = Title.objects.filter(reviews__comments__isnull=False).first()
+        author = User.objects.exclude(reviews__title=title).filter(
+            comments__isnull=False
+        ).first()
+        Title.objects.filter(pk=title.pk).update(pending_deletion=True)
+        User.objects.filter(pk=author.pk).update(pending_deletion=True)
+
+        def exported(dataset):
+            return {row[0] for row in export_rows(dataset)}
+
+        hidden = {
+            'titles': {title.pk},
+            'users': {author.pk},
+            'genre_title': set(
+                GenreTitle.objects.filter(title=title)
+                .values_list('pk', flat=True)
+            ),
+            'review': set(
+                Review.objects.filter(Q(title=title) | Q(author=author))
+                .values_list('pk', flat=True)
+            ),
+            'comments': set(
+                Comment.objects.filter(
+                    Q(review__title=title) | Q(review__author=author)
+                    | Q(author=author)
+                ).values_list('pk', flat=True)
+            ),
+        }
+        for dataset, pks in hidden.items():
+            model = DATASETS[dataset][0]
+            assert pks, dataset
+            assert exported(dataset) == set(
+                model.objects.values_list('pk', flat=True)
+            ) - pks, (
+                f'Проверьте, что выгрузка `{dataset}` не содержит записей, '
+                'ждущих удаления, и строк, ссылающихся на них.'
+            )
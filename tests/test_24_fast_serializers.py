@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+
+from tests.utils import create_comments
+
+
+def fetch(client, url, settings, fast):
+    settings.FAST_READ_SERIALIZERS = fast
+    for cache in caches.all():
+        cache.clear()
+    return client.get(url)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24FastSerializers:
+
+    @pytest.fixture
+    def data(self, admin_client, user_client, moderator_client,
+             user, moderator):
+        from reviews.models import Title
+
+        comments, reviews, titles = create_comments(
+            admin_client,
+            {user: user_client, moderator: moderator_client},
+        )
+        # Дробный рейтинг: IntegerField сериализатора отбрасывает дробь.
+        user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'text', 'score': 8},
+        )
+        moderator_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'text', 'score': 7},
+        )
+        Title.objects.filter(pk=titles[0]['id']).update(description='')
+        return titles, reviews, comments
+
+    def test_01_same_json(self, client, settings, data):
+        titles, reviews, comments = data
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?genre=genre-1',
+            '/api/v1/titles/?search=орешек',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            '/api/v1/titles/9999/',
+            '/api/v1/genres/',
+            '/api/v1/categories/?search=Фильм',
+            reviews_url,
+            f'{reviews_url}?pagination=cursor',
+            f'{reviews_url}{review_id}/',
+            f'{reviews_url}9999/',
+            comments_url,
+            f'{comments_url}?pagination=cursor',
+            f'{comments_url}{comments[0]["id"]}/',
+        )
+        for url in urls:
+            fast = fetch(client, url, settings, fast=True)
+            slow = fetch(client, url, settings, fast=False)
+            assert fast.status_code == slow.status_code, url
+            assert fast.content == slow.content, (
+                f'Проверьте, что быстрый сериализатор для `{url}` '
+                'возвращает тот же JSON, что и сериализатор DRF.'
+            )
+        assert fetch(
+            client, f'/api/v1/titles/{titles[1]["id"]}/', settings, fast=True
+        ).json()['rating'] == 7
+
+    def test_02_uses_values_rows(self, client, settings, data, monkeypatch):
+        from api.serializers import TitleReadSerializer
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Использован сериализатор DRF.')
+
+        monkeypatch.setattr(TitleReadSerializer, 'to_representation', fail)
+        response = fetch(client, '/api/v1/titles/', settings, fast=True)
+        assert response.status_code == HTTPStatus.OK
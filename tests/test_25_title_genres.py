@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def queries_to(context, table, statement='SELECT'):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(statement) and f'"{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleGenres:
+
+    @pytest.fixture
+    def catalogue(self):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {index}', slug=f'genre-{index}')
+            for index in range(10)
+        )
+
+    def test_01_create_resolves_slugs_in_one_query(
+            self, admin_client, catalogue
+    ):
+        from reviews.models import Title
+
+        slugs = [f'genre-{index}' for index in range(10)]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Произведение', 'year': 2000,
+                'category': 'movie', 'genre': slugs,
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        assert sorted(response.json()['genre']) == sorted(slugs)
+        assert len(queries_to(context, 'reviews_genre')) == 2, (
+            'Проверьте, что жанры находятся одним запросом по списку slug '
+            '(второй запрос - жанры в ответе).'
+        )
+        assert len(queries_to(
+            context, 'reviews_genretitle', 'INSERT'
+        )) == 1, 'Связи с жанрами должны добавляться одним запросом.'
+        assert Title.objects.get().genre.count() == 10
+
+    def test_02_unknown_slug(self, admin_client, catalogue):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение', 'year': 2000,
+            'category': 'movie', 'genre': ['genre-1', 'missing'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'missing' in response.json()['genre'][0]
+
+    def test_03_update_applies_delta(self, admin_client, catalogue):
+        from reviews.models import GenreTitle
+
+        title_id = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение', 'year': 2000, 'category': 'movie',
+            'genre': ['genre-0', 'genre-1', 'genre-2'],
+        }).json()['id']
+        kept = set(GenreTitle.objects.filter(
+            genre__slug__in=('genre-1', 'genre-2')
+        ).values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                f'/api/v1/titles/{title_id}/',
+                data={'genre': ['genre-1', 'genre-2', 'genre-3']},
+                format='json',
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(response.json()['genre']) == [
+            'genre-1', 'genre-2', 'genre-3'
+        ]
+        assert len(queries_to(
+            context, 'reviews_genretitle', 'DELETE'
+        )) == 1
+        assert len(queries_to(
+            context, 'reviews_genretitle', 'INSERT'
+        )) == 1
+        assert kept <= set(GenreTitle.objects.values_list('id', flat=True)), (
+            'Проверьте, что при изменении жанров сохранившиеся связи не '
+            'пересоздаются.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'name': 'Новое название'},
+            format='json',
+        )
+        assert sorted(response.json()['genre']) == [
+            'genre-1', 'genre-2', 'genre-3'
+        ], 'Изменение без жанров не должно затрагивать жанры.'
+
+    def test_04_cache_is_reset_after_genres_change(
+            self, admin_client, catalogue, monkeypatch
+    ):
+        from api import signals
+        from reviews.models import GenreTitle
+
+        title_id = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение', 'year': 2000, 'category': 'movie',
+            'genre': ['genre-0'],
+        }).json()['id']
+        genres_at_reset = []
+        invalidate = signals.invalidate
+
+        def recording_invalidate(*namespaces):
+            genres_at_reset.append(set(GenreTitle.objects.filter(
+                title_id=title_id
+            ).values_list('genre__slug', flat=True)))
+            invalidate(*namespaces)
+
+        monkeypatch.setattr(signals, 'invalidate', recording_invalidate)
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'genre': ['genre-1']},
+            format='json',
+        )
+        assert genres_at_reset and all(
+            genres == {'genre-1'} for genres in genres_at_reset
+        ), (
+            'Проверьте, что изменение произведения и его жанров выполняется '
+            'в одной транзакции и кэш сбрасывается после изменения жанров.'
+        )
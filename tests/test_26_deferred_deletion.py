@@ -0,0 +1,138 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.fixture
+def deferred_deletion(settings):
+    settings.DEFERRED_DELETION = {
+        **settings.DEFERRED_DELETION, 'EAGER': False
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26DeferredDeletion:
+
+    def test_01_title_delete_is_deferred(self, deferred_deletion, client,
+                                         admin_client, user_client):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'text', 5
+        ).json()
+        create_single_comment(admin_client, title_id, review['id'], 'c')
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        assert client.get(reviews_url).status_code == HTTPStatus.OK
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not any(
+            'reviews_review' in query['sql'] or 'reviews_comment' in
+            query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что удаление произведения через API не затрагивает '
+            'отзывы и комментарии: их удаляет обработчик.'
+        )
+        assert Review.objects.filter(title_id=title_id).exists()
+
+        for url in (f'/api/v1/titles/{title_id}/', reviews_url, comments_url):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что помеченное к удалению произведение, его '
+                f'отзывы и комментарии недоступны: {url}'
+            )
+        listed = [item['id'] for item in client.get(
+            '/api/v1/titles/'
+        ).json()['results']]
+        assert title_id not in listed
+
+        call_command('purge_deleted', '--once', '--batch-size', '1')
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Review.objects.filter(title_id=title_id).exists()
+        assert not Comment.objects.filter(review_id=review['id']).exists()
+        assert not GenreTitle.objects.filter(title_id=title_id).exists()
+
+    def test_02_user_delete_is_deferred(self, deferred_deletion,
+                                        admin_client, user_client, user,
+                                        admin):
+        from reviews.models import Comment, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'text', 10)
+        review = create_single_review(
+            user_client, title_id, 'text', 2
+        ).json()
+        create_single_comment(admin_client, title_id, review['id'], 'c')
+        admin_review = Review.objects.get(title_id=title_id, author=admin)
+        create_single_comment(user_client, title_id, admin_review.pk, 'c')
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        user.refresh_from_db()
+        assert user.pending_deletion and not user.is_active, (
+            'Проверьте, что удалённый пользователь сразу блокируется.'
+        )
+        assert admin_client.get(
+            f'/api/v1/users/{user.username}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+        call_command('purge_deleted', '--once', '--batch-size', '1')
+        assert not type(user).objects.filter(pk=user.pk).exists()
+        assert not Review.objects.filter(author_id=user.pk).exists()
+        assert not Comment.objects.filter(author_id=user.pk).exists()
+        assert not Comment.objects.filter(review_id=review['id']).exists()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_count, title.rating) == (1, 10), (
+            'Проверьте, что после удаления отзывов пользователя '
+            'пересчитывается рейтинг произведений.'
+        )
+        assert admin_client.get(
+            f'/api/v1/titles/{title_id}/'
+        ).json()['rating'] == 10, (
+            'Проверьте, что удаление отзывов сбрасывает кэш ответов.'
+        )
+
+    def test_03_signup_of_pending_user(self, deferred_deletion, client,
+                                       admin_client, user):
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'username': user.username, 'email': user.email},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что нельзя зарегистрироваться под пользователем, '
+            'который ещё удаляется.'
+        )
+
+    def test_04_eager_purge_is_scoped(self, settings, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        settings.DEFERRED_DELETION = {
+            **settings.DEFERRED_DELETION, 'EAGER': False
+        }
+        admin_client.delete(f'/api/v1/titles/{first}/')
+        settings.DEFERRED_DELETION = {
+            **settings.DEFERRED_DELETION, 'EAGER': True
+        }
+        admin_client.delete(f'/api/v1/titles/{second}/')
+        assert not Title.objects.filter(pk=second).exists()
+        assert Title.objects.filter(pk=first, pending_deletion=True).exists(), (
+            'Проверьте, что при EAGER запрос удаляет только свою запись, а '
+            'остальные помеченные оставляет обработчику.'
+        )
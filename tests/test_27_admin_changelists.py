@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import count_queries
+
+CHANGELISTS = (
+    '/admin/reviews/review/',
+    '/admin/reviews/comment/',
+    '/admin/reviews/title/',
+)
+
+
+def create_rows(count, offset=0):
+    from reviews.models import Category, Comment, Review, Title, User
+
+    category, _ = Category.objects.get_or_create(
+        slug='movie', defaults={'name': 'Фильм'}
+    )
+    for index in range(offset, offset + count):
+        author = User.objects.create(
+            username=f'author{index}', email=f'author{index}@yamdb.fake'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {index}', category=category
+        )
+        review = Review.objects.create(
+            author=author, title=title, text='Отзыв', score=5
+        )
+        Comment.objects.create(author=author, review=review, text='Коммент')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27AdminChangelists:
+
+    @pytest.fixture
+    def staff_client(self, client, user_superuser):
+        client.force_login(user_superuser)
+        return client
+
+    def test_01_query_count_does_not_depend_on_rows(self, staff_client):
+        create_rows(3)
+        small = {}
+        for url in CHANGELISTS:
+            response, small[url] = count_queries(staff_client, url)
+            assert response.status_code == HTTPStatus.OK, url
+        create_rows(20, offset=3)
+        for url in CHANGELISTS:
+            response, queries = count_queries(staff_client, url)
+            assert response.status_code == HTTPStatus.OK, url
+            assert queries == small[url], (
+                f'Проверьте, что число запросов страницы `{url}` не зависит '
+                f'от числа строк: {small[url]} и {queries}.'
+            )
+
+    def test_02_search(self, staff_client):
+        create_rows(3)
+        for url, query, expected in (
+            ('/admin/reviews/review/', 'author1', 'author1'),
+            ('/admin/reviews/comment/', 'author2', 'author2'),
+            ('/admin/reviews/title/', 'Произведение', 'Произведение 0'),
+        ):
+            response = staff_client.get(url, {'q': query})
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что поиск на странице `{url}` работает.'
+            )
+            assert expected in response.content.decode(), url
+
+    def test_03_paginator_limits_count(self, monkeypatch):
+        from reviews.admin import LimitedCountPaginator
+        from reviews.models import Review
+
+        create_rows(5)
+        monkeypatch.setattr(LimitedCountPaginator, 'count_limit', 3)
+        reviews = Review.objects.order_by('-id')
+        assert LimitedCountPaginator(reviews, 2).count == (
+            reviews.first().pk
+        ), (
+            'Проверьте, что число строк таблицы без фильтров оценивается '
+            'по наибольшему первичному ключу.'
+        )
+        assert LimitedCountPaginator(reviews.filter(score=5), 2).count == 3, (
+            'Проверьте, что отфильтрованный список считается не дальше '
+            'count_limit строк.'
+        )
+        assert LimitedCountPaginator(reviews.filter(score=1), 2).count == 0
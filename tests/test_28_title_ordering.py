@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+ORDERINGS = (
+    'name', '-year', '-rating', '-weighted_rating', '-rating_count'
+)
+
+
+@pytest.fixture
+def rated_titles(settings, admin_client, user_client, moderator_client):
+    """
+    Терминатор - одна оценка 10, Крепкий орешек - три оценки 8,
+     Чужой - без отзывов.
+    """
+    from reviews.models import Category, Title
+
+    settings.TITLE_RATING_PRIOR = {'MEAN': 5.5, 'WEIGHT': 10}
+    titles, categories, _ = create_titles(admin_client)
+    terminator, die_hard = titles[0]['id'], titles[1]['id']
+    alien = Title.objects.create(
+        name='Чужой', year=1979,
+        category=Category.objects.get(slug=categories[0]['slug']),
+    ).pk
+    create_single_review(admin_client, terminator, 'text', 10)
+    for api_client in (admin_client, user_client, moderator_client):
+        create_single_review(api_client, die_hard, 'text', 8)
+    return terminator, die_hard, alien
+
+
+def listed_ids(client, ordering):
+    response = client.get(f'/api/v1/titles/?ordering={ordering}')
+    assert response.status_code == HTTPStatus.OK
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleOrdering:
+
+    def test_01_ordering(self, client, rated_titles):
+        terminator, die_hard, alien = rated_titles
+        for ordering, expected in (
+            ('-year', [die_hard, terminator, alien]),
+            ('year', [alien, terminator, die_hard]),
+            ('-rating', [terminator, die_hard, alien]),
+            ('-weighted_rating', [die_hard, terminator, alien]),
+            ('-rating_count', [die_hard, terminator, alien]),
+        ):
+            assert listed_ids(client, ordering) == expected, (
+                'Проверьте, что список произведений сортируется параметром '
+                f'`ordering={ordering}`.'
+            )
+
+    def test_02_weighted_rating_follows_reviews(self, admin_client,
+                                                rated_titles):
+        from reviews.models import Review, Title
+
+        terminator, die_hard, alien = rated_titles
+        expected = {
+            terminator: (10 + 55) / 11,
+            die_hard: (24 + 55) / 13,
+            alien: 5.5,
+        }
+        for pk, weighted_rating in expected.items():
+            assert Title.objects.get(pk=pk).weighted_rating == (
+                pytest.approx(weighted_rating)
+            ), (
+                'Проверьте, что взвешенный рейтинг хранится в произведении '
+                'и учитывает TITLE_RATING_PRIOR.'
+            )
+
+        review = Review.objects.get(title_id=terminator)
+        admin_client.patch(
+            f'/api/v1/titles/{terminator}/reviews/{review.pk}/',
+            data={'score': 1}, format='json',
+        )
+        assert Title.objects.get(pk=terminator).weighted_rating == (
+            pytest.approx((1 + 55) / 11)
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{terminator}/reviews/{review.pk}/'
+        )
+        assert Title.objects.get(pk=terminator).weighted_rating == (
+            pytest.approx(5.5)
+        ), 'Проверьте, что удаление отзыва обновляет взвешенный рейтинг.'
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+    )
+    def test_03_orderings_use_indexes(self, client, rated_titles):
+        for ordering in ORDERINGS:
+            with CaptureQueriesContext(connection) as context:
+                listed_ids(client, ordering)
+            ordered = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('SELECT')
+                and 'FROM "reviews_title"' in query['sql']
+                and 'ORDER BY' in query['sql']
+            ]
+            assert ordered, ordering
+            for sql in ordered:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                assert not any('TEMP B-TREE' in step for step in plan), (
+                    f'Проверьте, что сортировка `ordering={ordering}` '
+                    f'читается по индексу.\n{sql}\n{plan}'
+                )
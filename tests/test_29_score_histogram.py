@@ -0,0 +1,155 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import count_queries, create_single_review, create_titles
+
+
+def expected_histogram(title_id):
+    """Гистограмма, посчитанная по таблице отзывов."""
+    from django.db.models import Count
+
+    from reviews.models import Review
+
+    histogram = {str(score): 0 for score in range(1, 11)}
+    for row in Review.objects.filter(title_id=title_id).order_by().values(
+        'score'
+    ).annotate(total=Count('id')):
+        histogram[str(row['score'])] = row['total']
+    return histogram
+
+
+@pytest.fixture
+def reviewed_titles(admin_client, user_client, moderator_client):
+    titles, _, _ = create_titles(admin_client)
+    first, second = titles[0]['id'], titles[1]['id']
+    create_single_review(admin_client, first, 'text', 10)
+    create_single_review(user_client, first, 'text', 7)
+    create_single_review(moderator_client, first, 'text', 7)
+    create_single_review(admin_client, second, 'text', 1)
+    return first, second
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ScoreHistogram:
+
+    def test_01_detail_histogram_follows_reviews(self, client, admin_client,
+                                                 reviewed_titles):
+        from reviews.models import Review
+
+        first, _ = reviewed_titles
+        url = f'/api/v1/titles/{first}/'
+        histogram = client.get(url).json().get('score_histogram')
+        assert histogram == expected_histogram(first), (
+            'Проверьте, что ответ на GET-запрос к `/api/v1/titles/{id}/` '
+            'содержит гистограмму оценок `score_histogram`.'
+        )
+        assert histogram['7'] == 2 and histogram['10'] == 1
+
+        review = Review.objects.get(title_id=first, score=10)
+        admin_client.patch(
+            f'{url}reviews/{review.pk}/', data={'score': 7}, format='json'
+        )
+        assert client.get(url).json()['score_histogram'] == (
+            expected_histogram(first)
+        ), 'Проверьте, что изменение оценки обновляет гистограмму.'
+        admin_client.delete(f'{url}reviews/{review.pk}/')
+        histogram = client.get(url).json()['score_histogram']
+        assert histogram == expected_histogram(first)
+        assert sum(histogram.values()) == 2, (
+            'Проверьте, что удаление отзыва обновляет гистограмму.'
+        )
+
+    def test_02_fast_and_drf_details_match(self, client, settings,
+                                           reviewed_titles):
+        from django.core.cache import caches
+
+        first, _ = reviewed_titles
+        responses = []
+        for fast in (True, False):
+            settings.FAST_READ_SERIALIZERS = fast
+            caches['api'].clear()
+            responses.append(client.get(f'/api/v1/titles/{first}/').content)
+        assert responses[0] == responses[1], (
+            'Проверьте, что быстрый сериализатор выводит гистограмму так же, '
+            'как сериализатор DRF.'
+        )
+
+    def test_03_bulk_histograms(self, client, reviewed_titles):
+        first, second = reviewed_titles
+        response, queries = count_queries(
+            client, f'/api/v1/titles/histograms/?ids={first},{second}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        results = {
+            item['id']: item['score_histogram']
+            for item in response.json()['results']
+        }
+        assert results == {
+            first: expected_histogram(first),
+            second: expected_histogram(second),
+        }, (
+            'Проверьте, что `/api/v1/titles/histograms/` возвращает '
+            'гистограммы перечисленных произведений.'
+        )
+        assert queries <= 2, (
+            'Проверьте, что гистограммы страницы произведений читаются '
+            f'одним запросом, а не {queries}.'
+        )
+
+    def test_04_bulk_reviews_and_purge_update_histograms(
+            self, admin_client, user, reviewed_titles
+    ):
+        from reviews.models import Title
+
+        first, second = reviewed_titles
+        admin_client.post('/api/v1/bulk/reviews/', data=[
+            {'title': second, 'author': user.username, 'text': 't',
+             'score': 4},
+        ], format='json')
+        assert Title.objects.get(pk=second).score_histogram[4] == 1, (
+            'Проверьте, что пакетная загрузка отзывов обновляет '
+            'гистограмму.'
+        )
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        for title_id in (first, second):
+            histogram = Title.objects.get(pk=title_id).score_histogram
+            assert {
+                str(score): count for score, count in histogram.items()
+            } == expected_histogram(title_id), (
+                'Проверьте, что удаление отзывов пользователя обновляет '
+                'гистограммы.'
+            )
+
+    def test_05_rebuild_in_single_pass(self, reviewed_titles):
+        from reviews.models import HISTOGRAM_FIELDS, Title
+
+        first, second = reviewed_titles
+        Title.objects.update(
+            rating_sum=0, rating_count=0, rating=None,
+            **dict.fromkeys(HISTOGRAM_FIELDS, 5),
+        )
+        with CaptureQueriesContext(connection) as context:
+            call_command('rebuild_ratings', stdout=StringIO())
+        review_reads = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_reads) == 1, (
+            'Проверьте, что rebuild_ratings читает таблицу отзывов одним '
+            'запросом.'
+        )
+        for title_id in (first, second):
+            title = Title.objects.get(pk=title_id)
+            assert {
+                str(score): count
+                for score, count in title.score_histogram.items()
+            } == expected_histogram(title_id)
+        title = Title.objects.get(pk=first)
+        assert (title.rating_sum, title.rating_count) == (24, 3)
+        assert title.rating == pytest.approx(8)
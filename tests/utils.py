@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -244,6 +247,26 @@ def create_titles(admin_client):
     return result, categories, genres
 
 
+def create_authors_reviews(title_id, count):
+    """
+    Создаёт в БД count авторов и по отзыву каждого из них на произведение
+     title_id; возвращает авторов.
+    """
+    from reviews.models import Review
+    from users.models import CustomUser
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'author{index}', email=f'{index}@yamdb.fake')
+        for index in range(count)
+    )
+    authors = CustomUser.objects.filter(username__startswith='author')
+    Review.objects.bulk_create(
+        Review(title_id=title_id, author=author, text='text', score=5)
+        for author in authors
+    )
+    return authors
+
+
 def create_reviews(admin_client, authors_map):
     titles, _, _ = create_titles(admin_client)
     result = []
@@ -305,3 +328,10 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def count_queries(client, url, method='get', **kwargs):
+    """Выполняет запрос и возвращает ответ и число SQL-запросов к БД."""
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(context.captured_queries)